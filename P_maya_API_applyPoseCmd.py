@@ -0,0 +1,66 @@
+# Applies a pose built by the pose manager (P_maya_c7_poseMgr.py) as one undoable step.
+
+# Objects:
+# MDGModifier holding every plug value of the pose, or an object with the same
+# doIt() and undoIt(), such as the curve edits of a clip import
+
+# Key points:
+# The pose manager resolves the plugs and fills an MDGModifier, leaves it in
+# pendingModifier of this module and calls maya.cmds.arApplyPose().
+# The command takes the modifier over, so the whole pose is a single entry in
+# the undo queue, instead of one entry per setAttr.
+
+import sys
+import maya.OpenMayaMPx as ompx
+
+kPluginCmdName = 'arApplyPose' # Name of the command, to be used as maya.cmds.arApplyPose()
+
+# the modifier of the next invocation, set by the pose manager right before it
+pendingModifier = None
+
+# define the command
+class scriptedCommand(ompx.MPxCommand):
+    def __init__(self):
+        ompx.MPxCommand.__init__(self)
+        # the modifier of this invocation, kept per instance for its undo queue entry
+        self.modifier = None
+
+    def doIt(self, *args):
+        global pendingModifier
+        # take over the modifier left by the pose manager
+        self.modifier = pendingModifier
+        pendingModifier = None
+        if self.modifier is None:
+            sys.stderr.write('ERROR: no pose to apply\n')
+            return
+        self.redoIt()
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+    def isUndoable(self):
+        return self.modifier is not None
+# class definition ends
+
+# Cmd creator
+def cmdCreator():
+    return ompx.asMPxPtr(scriptedCommand())
+
+# Initialize the script plug-in
+def initializePlugin(obj):
+    plugin = ompx.MFnPlugin(obj)
+    try:
+        plugin.registerCommand(kPluginCmdName, cmdCreator)
+    except:
+        sys.stderr.write('Failed to register command: %s\n' % kPluginCmdName)
+
+# Uninitialize the script plug-in
+def uninitializePlugin(obj):
+    plugin = ompx.MFnPlugin(obj)
+    try:
+        plugin.deregisterCommand(kPluginCmdName)
+    except:
+        sys.stderr.write('Failed to unregister command: %s' % kPluginCmdName)
@@ -1,164 +1,383 @@
-# Turns a selected nurbs curve to a helix.
-
-# Classes:
-# MPxCommand revisited
-# MSyntax is used to specify flags and arguments passed to commands
-# MArgDatabase parses argument lists based on a syntax object
-# MSyntax which describes the format for a command
-# MItSelectionList: Iterator of MSelectionList, allows filtering
-# MSelectionList: A list of MObjects
-# MFnNurbsCurve
-# MPointArray, MDoubleArray, MPoint
-# MItCurveCV
-# MDagPath
-# MGlobal
-
-# Important Functions: 
-# MGlobal.getActiveSelectionList() - To retrieve the selected curve 
-# syntaxCreator() - To create the syntax object MSyntax based on the flags
-# registerCommand revisited - add a third parameter, which is a reference to the syntax creator function
-
-# Key points:
-# MPxCommand.syntax() is intended to be used in an MArgDatabase constructor when the plugin
-# command's syntax is being initialized. 
-
-# The user should declare and define a syntax creator function that must be registered with Maya
-# by passing the function reference as a parameter in MFnPlugin::registerCommand()
-
-# When MPxCommand.syntax() is called it returns the syntax object that the user has created
-# in the custom syntax constructing method that was registered.
-
-# To avoid conflicts the user's syntax defining function must be given a name other than 'syntax'.
-
-import maya.OpenMaya as om
-import maya.OpenMayaMPx as ompx
-import sys, math
-
-kPluginCmdName = 'spHelix2'
-
-# Define command line flags, they will be used later in the syntax creator function. You have to
-# define short and long format of the flag
-kPitchFlag = '-p'
-kPitchLongFlag = '-pitch'
-kRadiusFlag = '-r'
-kRadiusLongFlag = '-radius'
-
-class scriptedCommand(ompx.MPxCommand):
-    def __init__(self):
-        # call the constuctor of the MPxCommand
-        ompx.MPxCommand.__init__(self)
-        
-        # define instance variables
-        # DagPath to point to selected curve
-        self.fDagPath = om.MDagPath()
-        # Array to store CV coordinates, array of MPoint(s)
-        self.fCVs = om.MPointArray()
-        # default values of radius and pitch
-        self.radius = 4.0
-        self.pitch = 0.5
-        
-    def doIt(self, args):
-        # parse the arguments
-        # self.syntax() is the MPxCommand method we talked about earlier
-        argData = om.MArgDatabase(self.syntax(), args)
-        if argData.isFlagSet(kPitchFlag):
-            self.pitch = argData.flagArgumentDouble(kPitchFlag, 0)
-        
-        if argData.isFlagSet(kRadiusFlag):
-            self.radius = argData.flagArgumentDouble(kRadiusFlag, 0)
-        
-        # instantiate MSelectionList to store active selections
-        slist = om.MSelectionList()
-        
-        # assign active list to slist
-        om.MGlobal.getActiveSelectionList(slist)
-        
-        # retrieve only NurbsCurves. Filter selection
-        i_list = om.MItSelectionList(slist, om.MFn.kNurbsCurve)
-        if i_list.isDone():
-            sys.stderr.write('Error: No curve selected\n')
-            return
-        
-        # retrieve the dag path of the current selection item, and store it in the in 
-        # the instance variable self.fDagPath
-        i_list.getDagPath(self.fDagPath)
-        self.redoIt()
-    
-    def redoIt(self):
-        # create a function set to operate on the curve pointed to by MDagPath
-        curveFn = om.MFnNurbsCurve(self.fDagPath)
-        
-        # get number of CVs
-        numCVs = curveFn.numCVs()
-        
-        # retrieve the CVs and store them in the CVs array
-        curveFn.getCVs(self.fCVs)
-        sys.stdout.write('numCVs: %s\n' % numCVs)
-        
-        # copy the CVs to another MPointArray, which will be used to construct the helix
-        points = om.MPointArray(self.fCVs)
-        
-        # calculate the coordinates of the helix CVs
-        for i in range(0, numCVs):
-            points.set(i, self.radius * math.cos(i), self.pitch * i, self.radius * math.sin(i))
-        
-        # Set CV at the given index to the given point.
-        # The method updateCurve should be called to trigger changes in the curve
-        curveFn.setCVs(points)
-        curveFn.updateCurve()
-    
-    def undoIt(self):
-        curveFn = om.MFnNurbsCurve(self.fDagPath)
-        
-        # update the curve with the original values of the CVs
-        curveFn.setCVs(self.fCVs)
-        curveFn.updateCurve()
-        self.fCVs.clear()
-        
-    def isUndoable(self):
-        return True
-    
-    # destructor to clear the list of CVs. Saves memory
-    def __del__(self):
-        self.fCVs.clear()
-# class definition ends
-
-# Creator
-def cmdCreator():
-    # Change ownership to maya
-    return ompx.asMPxPtr(scriptedCommand())
-
-# Syntax creator
-def syntaxCreator():
-    # create the syntax object
-    syntax = om.MSyntax()
-    # add the flags short form, long form and data type. First for the Pitch, and then radius
-    syntax.addFlag(kPitchFlag, kPitchLongFlag, om.MSyntax.kDouble)
-    syntax.addFlag(kRadiusFlag, kRadiusLongFlag, om.MSyntax.kDouble)
-    return syntax
-
-# Initialize the script plugin
-def initializePlugin(mobject):
-    mplugin = ompx.MFnPlugin(mobject, 'BlaBla', '2008', 'whatever')
-    try:
-        # a third argument was added. A reference to the syntax creator
-        mplugin.registerCommand(kPluginCmdName, cmdCreator, syntaxCreator)
-    except:
-        sys.stderr.write('Failed to register command helix')
-        raise
-
-# uninitialize plugin
-def uninitializePlugin(mobject):
-    mplugin = ompx.MFnPlugin(mobject)
-    try:
-        mplugin.deregisterCommand(kPluginCmdName)
-    except:
-        sys.stderr.write('Failed to unregister command helix')
-        raise
-
-    
-    
-        
-            
-            
-
+# Turns the selected nurbs curves to helices, or creates new helices in bulk from
+# a file of parameters (-file).
+
+# Classes:
+# MPxCommand revisited
+# MSyntax is used to specify flags and arguments passed to commands
+# MArgDatabase parses argument lists based on a syntax object
+# MSyntax which describes the format for a command
+# MItSelectionList: Iterator of MSelectionList, allows filtering
+# MSelectionList: A list of MObjects
+# MFnNurbsCurve
+# MPointArray, MDoubleArray, MPoint
+# MItCurveCV
+# MDagPath
+# MGlobal
+# MDagModifier, MFnTransform, MTransformationMatrix: to create the transforms in -file mode
+
+# Important Functions: 
+# MGlobal.getActiveSelectionList() - To retrieve the selected curve 
+# syntaxCreator() - To create the syntax object MSyntax based on the flags
+# registerCommand revisited - add a third parameter, which is a reference to the syntax creator function
+
+# Key points:
+# MPxCommand.syntax() is intended to be used in an MArgDatabase constructor when the plugin
+# command's syntax is being initialized. 
+
+# The user should declare and define a syntax creator function that must be registered with Maya
+# by passing the function reference as a parameter in MFnPlugin::registerCommand()
+
+# When MPxCommand.syntax() is called it returns the syntax object that the user has created
+# in the custom syntax constructing method that was registered.
+
+# To avoid conflicts the user's syntax defining function must be given a name other than 'syntax'.
+
+import maya.OpenMaya as om
+import maya.OpenMayaMPx as ompx
+import sys
+# batched helix math, importable without Maya
+import P_maya_API_helix2Math as helixMath
+
+kPluginCmdName = 'spHelix2'
+
+# Define command line flags, they will be used later in the syntax creator function. You have to
+# define short and long format of the flag
+kPitchFlag = '-p'
+kPitchLongFlag = '-pitch'
+kRadiusFlag = '-r'
+kRadiusLongFlag = '-radius'
+kCompressFlag = '-c'
+kCompressLongFlag = '-compress'
+kToleranceFlag = '-t'
+kToleranceLongFlag = '-tolerance'
+kFileFlag = '-f'
+kFileLongFlag = '-file'
+
+# (handle, (radius, pitch, step)) of the helix last applied to each curve, by full path
+# name. Lets the undo state of a curve the command generated itself shrink to the parameters
+generatedCurves = {}
+
+# The path of the curve shape itself, whether dagPath ends at it or at its transform
+def shapePath(dagPath):
+    if not dagPath.node().hasFn(om.MFn.kTransform):
+        return dagPath
+    path = om.MDagPath(dagPath)
+    path.extendToShape()
+    return path
+
+# Record the helix parameters applied to the curve at dagPath, or forget them with None
+def rememberCurve(dagPath, params):
+    path = shapePath(dagPath)
+    if params is None:
+        generatedCurves.pop(path.fullPathName(), None)
+    else:
+        generatedCurves[path.fullPathName()] = (om.MObjectHandle(path.node()), params)
+
+# Return the helix parameters recorded for the curve at dagPath, or None
+def curveParams(dagPath):
+    entry = generatedCurves.get(shapePath(dagPath).fullPathName())
+    if entry is None or not entry[0].isValid():
+        return None
+    return entry[1]
+
+# Drop the entries of curves that were deleted, so the registry does not grow with them
+def pruneGeneratedCurves():
+    for name, entry in list(generatedCurves.items()):
+        if not entry[0].isValid():
+            del generatedCurves[name]
+
+class scriptedCommand(ompx.MPxCommand):
+    def __init__(self):
+        # call the constuctor of the MPxCommand
+        ompx.MPxCommand.__init__(self)
+        
+        # define instance variables
+        # DagPaths to point to the selected curves
+        self.fDagPaths = []
+        # compact undo states holding the original CVs of each curve, and the
+        # entries of generatedCurves before this command touched them
+        self.fUndo = helixMath.CurveUndo()
+        # default values of radius and pitch
+        self.radius = 4.0
+        self.pitch = 0.5
+        # zlib compress the undo states
+        self.compress = False
+        # largest allowed distance from the ideal helix, None keeps one CV per CV
+        self.tolerance = None
+        # (numCVs, step) of the helix to build on each curve
+        self.fTargets = []
+        # rebuilds the curves whose CV count changes, undone as a unit
+        self.fModifier = om.MDGModifier()
+        # -file mode: helix parameters read from the file, and the transforms created
+        self.fParams = None
+        self.fCreated = []
+        # and the dag paths of their curve shapes
+        self.fCreatedCurves = []
+        
+    def doIt(self, args):
+        # parse the arguments
+        # self.syntax() is the MPxCommand method we talked about earlier
+        argData = om.MArgDatabase(self.syntax(), args)
+        pruneGeneratedCurves()
+        if argData.isFlagSet(kPitchFlag):
+            self.pitch = argData.flagArgumentDouble(kPitchFlag, 0)
+        
+        if argData.isFlagSet(kRadiusFlag):
+            self.radius = argData.flagArgumentDouble(kRadiusFlag, 0)
+        
+        self.compress = argData.isFlagSet(kCompressFlag)
+        
+        if argData.isFlagSet(kToleranceFlag):
+            self.tolerance = argData.flagArgumentDouble(kToleranceFlag, 0)
+            # no curve is within 0 of the ideal helix, whatever its CV count
+            if self.tolerance <= 0:
+                sys.stderr.write('Error: -tolerance must be greater than 0, got %s\n' % self.tolerance)
+                return
+        
+        # with a parameter file, create new curves instead of rewriting the selection
+        if argData.isFlagSet(kFileFlag):
+            self.createFromFile(argData.flagArgumentString(kFileFlag, 0))
+            return
+        
+        # instantiate MSelectionList to store active selections
+        slist = om.MSelectionList()
+        
+        # assign active list to slist
+        om.MGlobal.getActiveSelectionList(slist)
+        
+        # retrieve only NurbsCurves. Filter selection
+        i_list = om.MItSelectionList(slist, om.MFn.kNurbsCurve)
+        if i_list.isDone():
+            sys.stderr.write('Error: No curve selected\n')
+            return
+        
+        # retrieve the dag path of every selected curve, and store them in
+        # the instance variable self.fDagPaths
+        while not i_list.isDone():
+            dagPath = om.MDagPath()
+            i_list.getDagPath(dagPath)
+            self.fDagPaths.append(dagPath)
+            i_list.next()
+        
+        # pick the CV count of every helix. The original command places one CV per
+        # radian, so the ideal helix spans numCVs-1 radians
+        saved = 0
+        for dagPath in self.fDagPaths:
+            curveFn = om.MFnNurbsCurve(dagPath)
+            numCVs = curveFn.numCVs()
+            if self.tolerance is None:
+                self.fTargets.append((numCVs, helixMath.kDefaultStep))
+                continue
+            totalAngle = (numCVs - 1) * helixMath.kDefaultStep
+            degree = curveFn.degree()
+            count = helixMath.cvCountForTolerance(totalAngle, self.radius, self.tolerance, degree)
+            self.fTargets.append((count, totalAngle / (count - 1)))
+            saved += numCVs - count
+            if count != numCVs:
+                # rebuild to the new CV count, spans = CVs - degree on an open curve
+                self.fModifier.commandToExecute(
+                    'rebuildCurve -ch 0 -rpo 1 -rt 0 -end 1 -kr 0 -kcp 0 -kep 1 -kt 0 -s %d -d %d "%s"' %
+                    (count - degree, degree, dagPath.fullPathName()))
+        self.redoIt()
+        if self.tolerance is not None:
+            # negative when the tolerance needs more CVs than the curve had
+            sys.stdout.write('CVs saved: %s\n' % saved)
+            self.setResult(saved)
+    
+    def createFromFile(self, filePath):
+        if self.tolerance is not None and self.tolerance <= 0:
+            sys.stderr.write('Error: -tolerance must be greater than 0, got %s\n' % self.tolerance)
+            return
+        try:
+            self.fParams = helixMath.loadHelixParams(filePath)
+        except (IOError, ValueError, ImportError), e:
+            sys.stderr.write('Error: Cannot read helix parameters from %s: %s\n' % (filePath, e))
+            return
+        # the CV count and angular step of each helix, by its number of turns
+        for radius, turns in zip(self.fParams['radius'], self.fParams['turns']):
+            self.fTargets.append(helixMath.helixCVCount(turns, radius, self.tolerance))
+        self.redoIt()
+        # return the names of the new transforms
+        for obj in self.fCreated:
+            self.appendToResult(om.MFnDependencyNode(obj).name())
+    
+    def redoIt(self):
+        if self.fParams is not None:
+            self.createCurves()
+        else:
+            self.editCurves()
+    
+    def createCurves(self):
+        counts = [target[0] for target in self.fTargets]
+        steps = [target[1] for target in self.fTargets]
+        sys.stdout.write('creating curves: %s, numCVs: %s\n' % (len(counts), sum(counts)))
+        
+        # calculate the CVs of all the helices in a pool of worker threads
+        allPoints = helixMath.helixPointsBatch(counts, self.fParams['radius'], self.fParams['pitch'], steps)
+        
+        # create a parent transform for every helix in one modifier call
+        dagModifier = om.MDagModifier()
+        self.fCreated = [dagModifier.createNode('transform') for points in allPoints]
+        dagModifier.doIt()
+        
+        degree = 3
+        curveFn = om.MFnNurbsCurve()
+        self.fCreatedCurves = []
+        for obj, points, transform, params in zip(self.fCreated, allPoints, self.fParams['transforms'],
+                                                  zip(self.fParams['radius'], self.fParams['pitch'], steps)):
+            if transform is not None:
+                om.MFnTransform(obj).set(toTransformationMatrix(transform))
+            knots = om.MDoubleArray()
+            for knot in helixMath.knotVector(len(points), degree):
+                knots.append(knot)
+            # the curve shape goes under its transform
+            shape = curveFn.create(toMPointArray(points), knots, degree, om.MFnNurbsCurve.kOpen, False, False, obj)
+            # a later spHelix2 on the new curve only keeps these parameters for undo
+            dagPath = om.MDagPath.getAPathTo(shape)
+            rememberCurve(dagPath, params)
+            self.fCreatedCurves.append(dagPath)
+    
+    def editCurves(self):
+        # keep the original CVs of every curve in a compact undo state.
+        # API calls stay on the main thread
+        self.fUndo = helixMath.CurveUndo(self.compress)
+        for dagPath in self.fDagPaths:
+            curveFn = om.MFnNurbsCurve(dagPath)
+            cvs = om.MPointArray()
+            curveFn.getCVs(cvs)
+            self.fUndo.add(toRows(cvs), curveParams(dagPath))
+        # change the CV count of the curves that need it
+        self.fModifier.doIt()
+        counts = [target[0] for target in self.fTargets]
+        steps = [target[1] for target in self.fTargets]
+        sys.stdout.write('curves: %s, numCVs: %s\n' % (len(counts), sum(counts)))
+        
+        # calculate the helix CVs of all the curves in a pool of worker threads
+        allPoints = helixMath.helixPointsBatch(counts, self.radius, self.pitch, steps)
+        
+        # then apply them together. Since this all happens in one command
+        # invocation, undo/redo treat the whole batch as a single operation.
+        # The method updateCurve should be called to trigger changes in the curve
+        for dagPath, step, points in zip(self.fDagPaths, steps, allPoints):
+            # a fresh function set, the rebuild may have replaced the curve data
+            curveFn = om.MFnNurbsCurve(dagPath)
+            curveFn.setCVs(toMPointArray(points))
+            curveFn.updateCurve()
+            rememberCurve(dagPath, (self.radius, self.pitch, step))
+        sys.stdout.write('undo state: %s bytes\n' % self.undoBytes())
+    
+    def undoIt(self):
+        if self.fParams is not None:
+            # delete the created transforms along with their curve shapes
+            for dagPath in self.fCreatedCurves:
+                rememberCurve(dagPath, None)
+            self.fCreatedCurves = []
+            dagModifier = om.MDagModifier()
+            for obj in self.fCreated:
+                dagModifier.deleteNode(obj)
+            dagModifier.doIt()
+            self.fCreated = []
+            return
+        # restore the original CV counts first
+        self.fModifier.undoIt()
+        for dagPath, (state, prevParams) in zip(self.fDagPaths, self.fUndo):
+            curveFn = om.MFnNurbsCurve(dagPath)
+            
+            # update the curve with the original values of the CVs
+            curveFn.setCVs(toMPointArray(state.rows()))
+            curveFn.updateCurve()
+            rememberCurve(dagPath, prevParams)
+        self.fUndo = helixMath.CurveUndo()
+        
+    def isUndoable(self):
+        return True
+    
+    def undoBytes(self):
+        # number of bytes of CV data this command holds for undo
+        return self.fUndo.nbytes()
+    
+    # destructor to clear the undo states. Saves memory
+    def __del__(self):
+        self.fUndo = None
+# class definition ends
+
+# Convert the points computed by helixMath to an MPointArray
+def toMPointArray(points):
+    flat = helixMath.homogeneousFlat(points)
+    numCVs = len(flat) // 4
+    # a double[][4] block filled in one call, then copied into the array by its
+    # constructor, no SWIG call per CV
+    util = om.MScriptUtil()
+    util.createFromList(flat, len(flat))
+    try:
+        return om.MPointArray(util.asDouble4Ptr(), numCVs)
+    except (TypeError, NotImplementedError):
+        # builds whose bindings lack the double4 constructor
+        array = om.MPointArray()
+        array.setLength(numCVs)
+        for i in range(numCVs):
+            array.set(i, flat[4 * i], flat[4 * i + 1], flat[4 * i + 2])
+        return array
+
+# Convert an MPointArray to a list of [x, y, z] lists
+def toRows(array):
+    rows = []
+    for i in range(array.length()):
+        point = array[i]
+        rows.append([point.x, point.y, point.z])
+    return rows
+
+# Convert a transform read by helixMath.loadHelixParams(), a translation or a
+# row-major 4x4 matrix, to an MTransformationMatrix
+def toTransformationMatrix(values):
+    if len(values) == 3:
+        matrix = om.MTransformationMatrix()
+        matrix.setTranslation(om.MVector(values[0], values[1], values[2]), om.MSpace.kTransform)
+        return matrix
+    matrix = om.MMatrix()
+    om.MScriptUtil.createMatrixFromList(list(values), matrix)
+    return om.MTransformationMatrix(matrix)
+
+# Creator
+def cmdCreator():
+    # Change ownership to maya
+    return ompx.asMPxPtr(scriptedCommand())
+
+# Syntax creator
+def syntaxCreator():
+    # create the syntax object
+    syntax = om.MSyntax()
+    # add the flags short form, long form and data type. First for the Pitch, and then radius
+    syntax.addFlag(kPitchFlag, kPitchLongFlag, om.MSyntax.kDouble)
+    syntax.addFlag(kRadiusFlag, kRadiusLongFlag, om.MSyntax.kDouble)
+    syntax.addFlag(kToleranceFlag, kToleranceLongFlag, om.MSyntax.kDouble)
+    syntax.addFlag(kFileFlag, kFileLongFlag, om.MSyntax.kString)
+    # a flag without an argument, set or not set
+    syntax.addFlag(kCompressFlag, kCompressLongFlag)
+    return syntax
+
+# Initialize the script plugin
+def initializePlugin(mobject):
+    mplugin = ompx.MFnPlugin(mobject, 'BlaBla', '2008', 'whatever')
+    try:
+        # a third argument was added. A reference to the syntax creator
+        mplugin.registerCommand(kPluginCmdName, cmdCreator, syntaxCreator)
+    except:
+        sys.stderr.write('Failed to register command helix')
+        raise
+
+# uninitialize plugin
+def uninitializePlugin(mobject):
+    mplugin = ompx.MFnPlugin(mobject)
+    try:
+        mplugin.deregisterCommand(kPluginCmdName)
+    except:
+        sys.stderr.write('Failed to unregister command helix')
+        raise
+
+    
+    
+        
+            
+            
+
@@ -0,0 +1,488 @@
+# Math core for the spHelix2 command (P_maya_API_helix2Cmd.py).
+
+# The command used to compute the helix one CV at a time with math.cos/math.sin
+# and MPointArray.set. Here every CV position is computed in one batched NumPy
+# operation, so the command only has to hand the result to MFnNurbsCurve.setCVs
+# in a single call.
+
+# Nothing in this module imports Maya, so it can be imported, tested and timed
+# from a plain python interpreter as well as from mayapy.
+
+# Important Functions:
+# helixPoints() - batched CV positions, (numCVs, 3) float64 array
+# helixPointsLoop() - the original per-CV loop, kept as the reference
+# helixPointsBatch() - helixPoints() for many curves in a pool of worker threads
+# homogeneousFlat() - CVs as one flat x, y, z, w list, for a bulk MPointArray
+# benchmark() - times both from 1k to 1M CVs, including the hand-off to Maya
+# cvCountForTolerance() - fewest CVs reproducing the ideal helix within a tolerance
+# loadHelixParams() - radius, pitch, turns and transforms for bulk creation
+# knotVector() - knots of an open uniform curve
+# undoState() - compact undo storage for the original CVs of a curve
+# CurveUndo - what one command invocation keeps to undo its curve edits
+# measureUndoMemory() - memory the undo queue holds after many invocations
+
+import os, sys, math, cmath, time, struct, zlib, json, gc
+from array import array
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+import P_maya_utils as utils
+
+try:
+    import numpy
+except ImportError:
+    # mayapy builds without numpy fall back to the per-CV loop
+    numpy = None
+
+try:
+    import tracemalloc
+except ImportError:
+    # python 2 mayapy: the objects held are sized one by one instead
+    tracemalloc = None
+
+# angle in radians between two consecutive CVs, as in the original command
+kDefaultStep = 1.0
+# most CVs cvCountForTolerance() gives a curve, however small the tolerance
+kMaxCVs = 10000
+
+def helixPoints(numCVs, radius=4.0, pitch=0.5, step=kDefaultStep):
+    """
+    Return the CV positions of a helix with numCVs CVs as a (numCVs, 3) array.
+    CV i sits at angle i*step, x and z on a circle of the given radius and y
+    rising by pitch per radian.
+    """
+    if numpy is None:
+        return helixPointsLoop(numCVs, radius, pitch, step)
+    # angle of every CV, computed once for the whole curve
+    angles = numpy.arange(numCVs, dtype=numpy.float64)
+    angles *= step
+    points = numpy.empty((numCVs, 3), dtype=numpy.float64)
+    # write the columns in place to avoid temporaries on dense curves
+    numpy.cos(angles, out=points[:, 0])
+    points[:, 0] *= radius
+    numpy.multiply(angles, pitch, out=points[:, 1])
+    numpy.sin(angles, out=points[:, 2])
+    points[:, 2] *= radius
+    return points
+
+def helixPointsLoop(numCVs, radius=4.0, pitch=0.5, step=kDefaultStep):
+    """
+    Reference implementation: the per-CV loop the command used originally.
+    Return a list of [x, y, z] lists.
+    """
+    points = []
+    for i in range(0, numCVs):
+        angle = i * step
+        points.append([radius * math.cos(angle), pitch * angle, radius * math.sin(angle)])
+    return points
+
+def helixPointsBatch(counts, radius=4.0, pitch=0.5, step=kDefaultStep, workers=None):
+    """
+    Return a list holding helixPoints() for every CV count in counts, in order.
+    radius, pitch and step are each either one value for all the curves or a
+    list with one per curve.
+    The curves are computed in a pool of worker threads; numpy releases the GIL
+    inside cos/sin, so large batches use every core. workers defaults to the
+    number of CPUs.
+    """
+    jobs = list(zip(counts, _perCurve(radius, len(counts)), _perCurve(pitch, len(counts)),
+                    _perCurve(step, len(counts))))
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(jobs))
+    # not worth starting threads for a single curve, or without numpy
+    if workers < 2 or numpy is None:
+        return [helixPoints(*job) for job in jobs]
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(lambda job: helixPoints(*job), jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+def _perCurve(value, count):
+    """
+    Return value as a list of count values, repeating a single value
+    """
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value] * count
+
+def asRows(points):
+    """
+    Return points as a list of [x, y, z] lists, whatever helixPoints() returned
+    """
+    if hasattr(points, 'tolist'):
+        return points.tolist()
+    return points
+
+def homogeneousFlat(points):
+    """
+    Return points as one flat list x0, y0, z0, 1.0, x1, ... as
+    MScriptUtil.createFromList() takes it to build a double[][4] array, the
+    layout MPointArray is constructed from in a single call
+    """
+    if numpy is not None and hasattr(points, 'shape'):
+        flat = numpy.ones((points.shape[0], 4), dtype=numpy.float64)
+        flat[:, :3] = points
+        # one C level conversion of the whole buffer, no per-CV python objects
+        return flat.ravel().tolist()
+    flat = []
+    for point in points:
+        flat.extend((point[0], point[1], point[2], 1.0))
+    return flat
+
+def _evaluate(cvs, knots, degree, t):
+    """
+    Return the point at parameter t of the curve with the given CVs and full
+    knot vector (Maya's knots plus one more at each end), by de Boor
+    """
+    span = degree
+    while span < len(cvs) - 1 and knots[span + 1] <= t:
+        span += 1
+    points = [cvs[span - degree + i] for i in range(degree + 1)]
+    for r in range(1, degree + 1):
+        for i in range(degree, r - 1, -1):
+            k = span - degree + i
+            alpha = (t - knots[k]) / (knots[k + degree + 1 - r] - knots[k])
+            points[i] = (1.0 - alpha) * points[i - 1] + alpha * points[i]
+    return points[degree]
+
+def helixDeviation(radius, step, degree=3, numCVs=None, samples=32):
+    """
+    Return the largest distance from the ideal helix of the open curve Maya
+    builds from numCVs CVs sitting on the helix every step radians, with the
+    knots of knotVector(). Each curve point is compared with the helix point
+    at the same height, so only the distance in the xz plane is measured.
+    The clamped end spans stray further than the interior ones, which are all
+    alike, so a long curve is measured on a shorter one with the same end
+    spans and a single interior span. numCVs None measures such a curve.
+    """
+    # ends of degree spans each, with at least one full interior span in between
+    shortest = 3 * degree + 2
+    if numCVs is None or numCVs > shortest:
+        numCVs = shortest
+    numCVs = max(numCVs, degree + 1)
+    spans = numCVs - degree
+    knots = [0.0] + knotVector(numCVs, degree) + [float(spans)]
+    cvs = [cmath.exp(1j * i * step) for i in range(numCVs)]
+    # the height of the curve, in CV indices, gives the angle it should be at
+    heights = [float(i) for i in range(numCVs)]
+    worst = 0.0
+    for k in range(spans * samples + 1):
+        t = float(k) / samples
+        point = _evaluate(cvs, knots, degree, t)
+        ideal = cmath.exp(1j * _evaluate(heights, knots, degree, t) * step)
+        worst = max(worst, abs(point - ideal))
+    return worst * radius
+
+def cvCountForTolerance(totalAngle, radius, tolerance, degree=3, maxCVs=kMaxCVs):
+    """
+    Return the smallest number of CVs, spread evenly over totalAngle radians,
+    whose curve stays within tolerance of the ideal helix, at most maxCVs.
+    Raise ValueError for a tolerance that is not positive.
+    """
+    if not tolerance > 0:
+        raise ValueError('Tolerance must be greater than 0, got %s' % tolerance)
+    def fits(numCVs):
+        return helixDeviation(radius, float(totalAngle) / (numCVs - 1), degree, numCVs) <= tolerance
+    low = degree + 1
+    if fits(low):
+        return low
+    # grow until it fits, then bisect; the deviation rises with the step
+    high = low
+    while not fits(high):
+        if high >= maxCVs:
+            return maxCVs
+        low = high
+        high = min(high * 2, maxCVs)
+    while high - low > 1:
+        mid = (low + high) // 2
+        if fits(mid):
+            high = mid
+        else:
+            low = mid
+    return high
+
+def knotVector(numCVs, degree=3):
+    """
+    Return the knots of an open, uniform curve with numCVs CVs, in Maya's
+    convention of spans + 2*degree - 1 knots
+    """
+    spans = numCVs - degree
+    return [0.0] * degree + [float(i) for i in range(1, spans)] + [float(spans)] * degree
+
+def helixCVCount(turns, radius, tolerance=None, degree=3, step=kDefaultStep):
+    """
+    Return (numCVs, step) for a helix of the given number of turns: one CV
+    every step radians, or the fewest CVs within tolerance when one is given
+    """
+    totalAngle = turns * 2.0 * math.pi
+    if tolerance is not None:
+        numCVs = cvCountForTolerance(totalAngle, radius, tolerance, degree)
+    else:
+        numCVs = max(int(math.ceil(totalAngle / step)) + 1, degree + 1)
+    return (numCVs, totalAngle / (numCVs - 1))
+
+# names of the parameters read by loadHelixParams(), and their values when missing
+kHelixParamNames = ('radius', 'pitch', 'turns', 'transforms')
+kHelixParamDefaults = (4.0, 0.5, 1.0, None)
+
+def loadHelixParams(path):
+    """
+    Read the parameters of many helices from a .json, .npy or .npz file.
+    Return a dict with 'radius', 'pitch' and 'turns' lists of floats and
+    'transforms', a list holding per helix None, a translation [x, y, z] or a
+    row-major 4x4 matrix as 16 floats.
+    
+    .json: {"radius": [...], "pitch": [...], ...}, scalars apply to every helix,
+        or a list of {"radius": r, "pitch": p, ...} records, missing values
+        take the defaults in both forms
+    .npz: arrays named radius, pitch, turns and optionally transforms
+    .npy: a structured array with those fields, or a float array whose columns
+        are radius, pitch, turns and optionally 3 or 16 transform values
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        f = open(path, 'r')
+        try:
+            data = json.load(f)
+        finally:
+            f.close()
+        if isinstance(data, list):
+            for i, record in enumerate(data):
+                if not isinstance(record, dict):
+                    raise ValueError('helix record %d is not an object: %r' % (i, record))
+            data = dict([(name, [record.get(name, default) for record in data])
+                         for name, default in zip(kHelixParamNames, kHelixParamDefaults)])
+    elif ext in ('.npy', '.npz'):
+        if numpy is None:
+            raise ImportError('numpy is required to read %s' % path)
+        array = numpy.load(path)
+        if ext == '.npz':
+            data = dict([(name, array[name].tolist()) for name in array.files])
+        elif array.dtype.names:
+            data = dict([(name, array[name].tolist()) for name in array.dtype.names])
+        else:
+            array = numpy.atleast_2d(array)
+            data = {'radius': array[:, 0].tolist(), 'pitch': array[:, 1].tolist(),
+                    'turns': array[:, 2].tolist()}
+            if array.shape[1] > 3:
+                data['transforms'] = array[:, 3:].tolist()
+    else:
+        raise ValueError('Unsupported helix parameter file: %s' % path)
+    # a single transform is a flat list of numbers, broadcast it like a scalar
+    single = None
+    transforms = data.get('transforms')
+    if isinstance(transforms, list) and transforms and not isinstance(transforms[0], (list, type(None))):
+        single = data.pop('transforms')
+    # every parameter as a list of the same length, scalars broadcast
+    lists = [data.get(name) for name in kHelixParamNames]
+    count = max([len(value) for value in lists if isinstance(value, list)] or [1])
+    params = {}
+    for name, default in zip(kHelixParamNames, kHelixParamDefaults):
+        value = data.get(name, default)
+        if name == 'transforms' and single is not None:
+            value = [single] * count
+        elif not isinstance(value, list):
+            value = [value] * count
+        if len(value) != count:
+            raise ValueError('%s has %d values, expected %d' % (name, len(value), count))
+        params[name] = value
+    for name in kHelixParamNames[:3]:
+        for i, value in enumerate(params[name]):
+            try:
+                params[name][i] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError('%s of helix %d is not a number: %r' % (name, i, value))
+    return params
+
+class PackedPoints(object):
+    """
+    Undo state holding the CVs of a curve in one packed buffer of x, y, z
+    doubles, so undo restores them exactly, optionally zlib compressed
+    """
+    def __init__(self, rows, compress=False):
+        self.numCVs = len(rows)
+        self.compressed = compress
+        flat = [c for row in rows for c in row[:3]]
+        self.data = struct.pack('<%dd' % len(flat), *flat)
+        if compress:
+            self.data = zlib.compress(self.data)
+    
+    def rows(self):
+        """
+        Return the stored CVs as a list of [x, y, z] lists
+        """
+        data = self.data
+        if self.compressed:
+            data = zlib.decompress(data)
+        flat = struct.unpack('<%dd' % (3 * self.numCVs), data)
+        return [list(flat[i:i+3]) for i in range(0, len(flat), 3)]
+    
+    def nbytes(self):
+        return len(self.data)
+
+class HelixParams(object):
+    """
+    Undo state of a curve spHelix2 generated itself: only the helix parameters
+    are stored and the CVs are regenerated on undo
+    """
+    def __init__(self, numCVs, radius, pitch, step=kDefaultStep):
+        self.numCVs = numCVs
+        self.radius = radius
+        self.pitch = pitch
+        self.step = step
+    
+    def rows(self):
+        return asRows(helixPoints(self.numCVs, self.radius, self.pitch, self.step))
+    
+    def nbytes(self):
+        # one count and three doubles
+        return struct.calcsize('<Iddd')
+
+def matchesHelix(rows, radius, pitch, step=kDefaultStep, tolerance=0.0):
+    """
+    Return whether rows are still the CVs of the helix with the given
+    parameters. The default tolerance of 0 only accepts the very values
+    helixPoints() regenerates, so an undo from the parameters is exact.
+    """
+    expected = asRows(helixPoints(len(rows), radius, pitch, step))
+    for row, other in zip(rows, expected):
+        for a, b in zip(row, other):
+            if abs(a - b) > tolerance:
+                return False
+    return True
+
+def undoState(rows, compress=False, params=None):
+    """
+    Return the most compact undo state for the CVs in rows.
+    params is the (radius, pitch, step) spHelix2 last applied to the curve, or
+    None; if the CVs still match that helix only the parameters are kept.
+    """
+    if params is not None and matchesHelix(rows, *params):
+        return HelixParams(len(rows), *params)
+    return PackedPoints(rows, compress)
+
+class CurveUndo(object):
+    """
+    What one spHelix2 invocation keeps to undo its edit of the curves: per
+    curve the undoState() of its original CVs and the helix parameters
+    recorded for it before, or None
+    """
+    def __init__(self, compress=False):
+        self.compress = compress
+        self.states = []
+        self.prevParams = []
+    
+    def add(self, rows, prevParams=None):
+        self.states.append(undoState(rows, self.compress, prevParams))
+        self.prevParams.append(prevParams)
+    
+    def __iter__(self):
+        # (state, prevParams) per curve, in the order they were added
+        return iter(zip(self.states, self.prevParams))
+    
+    def nbytes(self):
+        # number of bytes of CV data held
+        return sum([state.nbytes() for state in self.states])
+
+class _FullCopy(object):
+    """
+    Undo state of the original command: every CV as an MPoint, four doubles
+    """
+    def __init__(self, rows):
+        self.data = array('d', [c for row in rows for c in (row[0], row[1], row[2], 1.0)])
+
+def _retainedBytes(invocations, makeUndo, shared):
+    """
+    Call makeUndo() invocations times, keeping every result as the undo queue
+    keeps its commands, and return the bytes they still hold: the traced
+    allocations while tracemalloc is tracing, else the sizes of every object
+    reachable from them but not from shared
+    """
+    gc.collect()
+    tracing = tracemalloc is not None and tracemalloc.is_tracing()
+    if tracing:
+        before = tracemalloc.get_traced_memory()[0]
+    queue = []
+    for i in range(invocations):
+        queue.append(makeUndo())
+    gc.collect()
+    if tracing:
+        return tracemalloc.get_traced_memory()[0] - before
+    return utils.deepSize(queue, set([id(obj) for obj in shared]))
+
+def measureUndoMemory(invocations=10000, numCVs=64, compress=False, stream=sys.stdout):
+    """
+    Build the CurveUndo that invocations spHelix2 commands on a curve with
+    numCVs CVs keep, the way editCurves() builds it, and report the memory
+    they hold: full MPoint copies as the original command kept, packed
+    buffers for an arbitrary curve and parameters only for a curve the
+    command generated. The allocations are traced with tracemalloc, or where
+    it is missing the objects held are sized with sys.getsizeof.
+    Return a (fullBytes, packedBytes, paramsBytes) tuple.
+    """
+    # an arbitrary curve: a noisy line, so compression has real data to chew on
+    rows = [[i * 0.37, math.sin(i * 1.3) * 2.0, math.cos(i * 0.7)] for i in range(numCVs)]
+    params = (4.0, 0.5, kDefaultStep)
+    generated = asRows(helixPoints(numCVs, *params))
+    started = False
+    if tracemalloc is not None and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started = True
+    def makeUndo(cvs, prevParams):
+        # editCurves() hands the state a fresh copy of the CVs, from toRows()
+        undo = CurveUndo(compress)
+        undo.add([list(row) for row in cvs], prevParams)
+        return undo
+    try:
+        fullBytes = _retainedBytes(invocations, lambda: _FullCopy(rows), [rows])
+        packedBytes = _retainedBytes(invocations, lambda: makeUndo(rows, None), [rows])
+        paramsBytes = _retainedBytes(invocations, lambda: makeUndo(generated, params), [generated, params])
+    finally:
+        if started:
+            tracemalloc.stop()
+    results = (fullBytes, packedBytes, paramsBytes)
+    stream.write('%d invocations of %d CVs%s: full copies %d bytes, packed %d bytes, '
+                 'parameters only %d bytes\n' %
+                 ((invocations, numCVs, ' (compressed)' if compress else '') + results))
+    return results
+
+def benchmark(sizes=(1000, 10000, 100000, 1000000), repeat=3, stream=sys.stdout):
+    """
+    Time what the command pays outside of Maya's C++ for each CV count in
+    sizes: the original per-CV loop against helixPoints() followed by the
+    homogeneousFlat() hand-off that toMPointArray() passes to MScriptUtil.
+    The MPointArray construction itself is one C++ call and is not timed.
+    Return a list of (numCVs, loopSeconds, batchSeconds) tuples, the best of
+    repeat runs each.
+    """
+    results = []
+    for numCVs in sizes:
+        loopTime = _bestOf(repeat, helixPointsLoop, numCVs)
+        batchTime = _bestOf(repeat, lambda n: homogeneousFlat(helixPoints(n)), numCVs)
+        results.append((numCVs, loopTime, batchTime))
+        stream.write('%9d CVs: loop %.4fs, batched %.4fs (x%.1f)\n' %
+                     (numCVs, loopTime, batchTime, loopTime / max(batchTime, 1e-9)))
+    return results
+
+def _bestOf(repeat, func, *args):
+    """
+    Return the shortest wall time of repeat calls to func(*args)
+    """
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        func(*args)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+if __name__ == '__main__':
+    if numpy is None:
+        sys.stderr.write('numpy not available, timing the fallback loop against itself\n')
+    benchmark()
+    measureUndoMemory()
+    measureUndoMemory(compress=True)
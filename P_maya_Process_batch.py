@@ -0,0 +1,261 @@
+"""
+Command line batch runner for P_maya_Process_textures.py.
+
+Runs process_all_textures on every scene of a list, each scene in its own
+worker process and with its own out_dir, several scenes at a time. A scene
+that fails is retried in a fresh process. The processed, error and skipped
+textures of every scene, with timings, go to one json report.
+
+    mayapy P_maya_Process_batch.py shot010.ma shot020.ma --out-root /renders/tex --workers 4
+
+--module names the module holding process_all_textures. It defaults to
+P_maya_Process_textures, which needs mayapy. A stand-in module for testing
+defines process_all_textures(out_dir, new_file, workers, cleanup) and
+open_scene(path), and runs under any python with --no-maya, as
+P_maya_Process_standin does:
+
+    python P_maya_Process_batch.py shot010.json --module P_maya_Process_standin --no-maya
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import tempfile
+import traceback
+import subprocess
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+DEFAULT_MODULE = 'P_maya_Process_textures'
+# seconds between checks on a running worker
+POLL_INTERVAL = 0.2
+
+def scene_out_dirs(scenes, out_root):
+    """
+    Return one output folder in out_root per scene, named after the scene,
+    with a numbered suffix when two scenes share a name
+
+    scenes = paths of the scene files (list)
+    out_root = folder holding the per scene folders (string)
+    """
+    out_dirs = []
+    used = set()
+    for scene in scenes:
+        name = os.path.splitext(os.path.basename(scene))[0]
+        candidate = name
+        count = 1
+        while candidate in used:
+            candidate = '%s_%d' % (name, count)
+            count += 1
+        used.add(candidate)
+        out_dirs.append(os.path.join(out_root, candidate))
+    return out_dirs
+
+def process_scene(scene, out_dir, module_name, use_maya, image_workers, cleanup):
+    """
+    Open scene and run process_all_textures on it, in this process.
+    Return a dict of the processed, error and skipped textures.
+
+    scene = path of the scene file (string)
+    out_dir = output folder of the scene (string)
+    module_name = module holding process_all_textures (string)
+    use_maya = start maya.standalone and open the scene with maya.cmds (bool)
+    image_workers = image processing processes of the scene (int)
+    cleanup = delete orphaned shading networks (bool)
+    """
+    if use_maya:
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+    module = __import__(module_name)
+    if hasattr(module, 'open_scene'):
+        module.open_scene(scene)
+    else:
+        import maya.cmds
+        maya.cmds.file(scene, open=True, force=True)
+    processed, errors, skipped = module.process_all_textures(
+        out_dir=out_dir, new_file=os.path.basename(scene), workers=image_workers, cleanup=cleanup)
+    return {'processed': [str(name) for name in processed],
+            'errors': [str(name) for name in errors],
+            'skipped': [str(name) for name in skipped]}
+
+def run_worker(args):
+    """
+    Entry point of a worker process: process one scene and write the result,
+    or the error, to args.result as json. Return the exit code.
+    """
+    start = time.time()
+    try:
+        result = process_scene(args.scene, args.out_dir, args.module, args.maya,
+                               args.image_workers, args.cleanup)
+        result['ok'] = True
+    except Exception:
+        result = {'ok': False, 'error': traceback.format_exc()}
+    result['seconds'] = time.time() - start
+    f = open(args.result, 'w')
+    try:
+        json.dump(result, f)
+    finally:
+        f.close()
+    return 0 if result['ok'] else 1
+
+def start_process(command, **kwargs):
+    """
+    Start command in a process group of its own, so kill_process() also
+    reaches the processes it starts
+    """
+    if os.name == 'nt':
+        return subprocess.Popen(command, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP, **kwargs)
+    return subprocess.Popen(command, preexec_fn=os.setsid, **kwargs)
+
+def kill_process(process):
+    """
+    Kill a process started with start_process() and every process of its
+    group, such as the image workers of a scene, and wait for it
+    """
+    if os.name == 'nt':
+        # taskkill /T follows the tree of child processes
+        devnull = open(os.devnull, 'w')
+        try:
+            subprocess.call(['taskkill', '/F', '/T', '/PID', str(process.pid)], stdout=devnull, stderr=devnull)
+        finally:
+            devnull.close()
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            # the group is already gone
+            pass
+    process.wait()
+
+def run_attempt(scene, out_dir, args):
+    """
+    Process scene in a new worker process and return its result dict. A
+    worker that crashes or runs past args.timeout counts as a failure. On
+    timeout the worker is killed with the processes it started, before a
+    retry can write to out_dir.
+    """
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    fd, result_path = tempfile.mkstemp(prefix='scene_', suffix='.json', dir=out_dir)
+    os.close(fd)
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--scene', scene, '--out-dir', out_dir,
+               '--result', result_path, '--module', args.module, '--image-workers', str(args.image_workers)]
+    if not args.maya:
+        command.append('--no-maya')
+    if args.cleanup:
+        command.append('--cleanup')
+    env = dict(os.environ)
+    # the worker imports the processing module from where it was found here
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.abspath(__file__))] +
+                                        [path for path in [env.get('PYTHONPATH')] if path])
+    log = open(os.path.join(out_dir, 'batch.log'), 'a')
+    start = time.time()
+    try:
+        process = start_process(command, stdout=log, stderr=subprocess.STDOUT, env=env)
+        while process.poll() is None:
+            if args.timeout and time.time() - start > args.timeout:
+                kill_process(process)
+                return {'ok': False, 'error': 'timed out after %ds' % args.timeout, 'seconds': time.time() - start}
+            time.sleep(POLL_INTERVAL)
+        try:
+            f = open(result_path)
+            try:
+                result = json.load(f)
+            finally:
+                f.close()
+        except ValueError:
+            # the worker died before writing its result
+            result = {'ok': False, 'error': 'worker exited with code %d' % process.returncode}
+        result['seconds'] = time.time() - start
+        return result
+    finally:
+        log.close()
+        if os.path.exists(result_path):
+            os.remove(result_path)
+
+def run_scene(scene, out_dir, args):
+    """
+    Process scene, retrying up to args.retries times. Return its report entry.
+    """
+    attempts = []
+    for attempt in range(args.retries + 1):
+        result = run_attempt(scene, out_dir, args)
+        attempts.append({'seconds': result['seconds'], 'error': result.get('error')})
+        if result['ok']:
+            break
+    entry = {'scene': scene, 'out_dir': out_dir, 'ok': result['ok'], 'attempts': attempts,
+             'seconds': sum([item['seconds'] for item in attempts])}
+    for key in ('processed', 'errors', 'skipped'):
+        entry[key] = result.get(key, [])
+    sys.stdout.write('%s %s in %.1fs (%d attempts), %d processed, %d errors\n' % (
+        scene, 'done' if result['ok'] else 'FAILED', entry['seconds'], len(attempts),
+        len(entry['processed']), len(entry['errors'])))
+    return entry
+
+def run_batch(args):
+    """
+    Process every scene of args.scenes, args.workers at a time, and write the
+    report. Return the report dict.
+    """
+    start = time.time()
+    out_dirs = scene_out_dirs(args.scenes, args.out_root)
+    # a thread per running worker process, which does the actual work
+    pool = ThreadPool(max(1, min(args.workers, len(args.scenes))))
+    try:
+        entries = pool.map(lambda job: run_scene(job[0], job[1], args), list(zip(args.scenes, out_dirs)))
+    finally:
+        pool.close()
+        pool.join()
+    report = {'module': args.module, 'workers': args.workers, 'image_workers': args.image_workers,
+              'seconds': time.time() - start, 'scenes': entries,
+              'failed': [entry['scene'] for entry in entries if not entry['ok']]}
+    report_path = args.report or os.path.join(args.out_root, 'report.json')
+    f = open(report_path, 'w')
+    try:
+        json.dump(report, f, indent=2)
+    finally:
+        f.close()
+    sys.stdout.write('%d scenes in %.1fs, %d failed, report written to %s\n' % (
+        len(entries), report['seconds'], len(report['failed']), report_path))
+    return report
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Run process_all_textures on many scenes in parallel.')
+    parser.add_argument('scenes', nargs='*', help='scene files to process')
+    parser.add_argument('--out-root', default=os.getcwd(), help='folder for the per scene output folders')
+    parser.add_argument('--workers', type=int, default=max(1, multiprocessing.cpu_count() // 2),
+                        help='scenes processed at the same time')
+    parser.add_argument('--image-workers', type=int, default=None,
+                        help='image processing processes per scene, by default the CPUs shared out')
+    parser.add_argument('--retries', type=int, default=1, help='retries of a failed scene')
+    parser.add_argument('--timeout', type=float, default=0, help='seconds before a scene is killed, 0 for none')
+    parser.add_argument('--report', default=None, help='json report path, by default report.json in --out-root')
+    parser.add_argument('--module', default=DEFAULT_MODULE, help='module holding process_all_textures')
+    parser.add_argument('--no-maya', dest='maya', action='store_false',
+                        help='do not start maya.standalone, for stand-in modules')
+    parser.add_argument('--cleanup', action='store_true', help='delete orphaned shading networks')
+    # worker process options
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--scene', help=argparse.SUPPRESS)
+    parser.add_argument('--out-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.image_workers is None:
+        args.image_workers = max(1, multiprocessing.cpu_count() // max(1, args.workers))
+    if not args.worker and not args.scenes:
+        parser.error('no scene files given')
+    return args
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.worker:
+        return run_worker(args)
+    if not os.path.isdir(args.out_root):
+        os.makedirs(args.out_root)
+    report = run_batch(args)
+    return 1 if report['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+Image processing stage for P_maya_Process_textures.py.
+
+Resizes and converts texture images into an output folder, in a bounded pool
+of worker processes. The workers are fresh python processes, never forks of
+the Maya process. Nothing in this module imports Maya, so the workers can run
+it in a plain python or mayapy process.
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import threading
+import subprocess
+import multiprocessing
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+import P_maya_utils as utils
+
+# manifest of processed images, kept in the output folder
+MANIFEST_NAME = 'texture_manifest.json'
+MANIFEST_VERSION = 1
+# bytes read at a time when hashing
+HASH_BLOCK = 1024 * 1024
+
+# PIL format names by file extension
+FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.tif': 'TIFF', '.tiff': 'TIFF',
+           '.tga': 'TGA', '.bmp': 'BMP'}
+# PIL save options by format, instead of its defaults such as JPEG quality 75
+SAVE_OPTIONS = {'JPEG': {'quality': 95, 'subsampling': 0}}
+
+def output_path(src, out_dir, image_format=None):
+    """
+    Return the path in out_dir of the processed image of src
+
+    src = path of the source image (string)
+    out_dir = output folder (string)
+    image_format = extension of the output, e.g. '.png', None keeps the source's
+    """
+    stem, ext = os.path.splitext(os.path.basename(src))
+    return os.path.join(out_dir, stem + (image_format or ext))
+
+def process_image(job):
+    """
+    Resize and convert one image. Return (src, dst, ok, message).
+
+    job = (src, dst, max_size) with max_size the longest side in pixels, or None
+    to keep the size. An image that needs neither a smaller size nor another
+    format is copied as it is, and so is one in a format PIL cannot read, such
+    as EXR, when its format does not change. Without PIL an image is only
+    copied, and only when neither its size nor its format has to change.
+    """
+    src, dst, max_size = job
+    try:
+        same_format = os.path.splitext(src)[1].lower() == os.path.splitext(dst)[1].lower()
+        if Image is None:
+            if max_size or not same_format:
+                return (src, dst, False, 'PIL is not available to resize or convert')
+            shutil.copy2(src, dst)
+            return (src, dst, True, 'copied')
+        image = None
+        if max_size or not same_format:
+            try:
+                # only reads the header
+                image = Image.open(src)
+            except (IOError, OSError):
+                if not same_format:
+                    raise
+        resize = image is not None and max_size and max(image.size) > max_size
+        if same_format and not resize:
+            # nothing to do that would be worth re-encoding the image
+            shutil.copy2(src, dst)
+            return (src, dst, True, 'copied')
+        if resize:
+            image.thumbnail((max_size, max_size), Image.LANCZOS if hasattr(Image, 'LANCZOS') else Image.ANTIALIAS)
+        image_format = FORMATS.get(os.path.splitext(dst)[1].lower())
+        # JPEG has no alpha channel
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(dst, image_format, **SAVE_OPTIONS.get(image_format, {}))
+        return (src, dst, True, '%dx%d' % image.size)
+    except (IOError, OSError, ValueError) as e:
+        return (src, dst, False, str(e))
+
+def content_hash(path):
+    """
+    Return the sha1 hex digest of the file at path, read in blocks
+    """
+    digest = hashlib.sha1()
+    f = open(path, 'rb')
+    try:
+        block = f.read(HASH_BLOCK)
+        while block:
+            digest.update(block)
+            block = f.read(HASH_BLOCK)
+    finally:
+        f.close()
+    return digest.hexdigest()
+
+class Manifest(object):
+    """
+    Record of the images already processed into out_dir, stored there as json.
+    An output is current when it exists and was made from a source with the
+    same content hash and the same processing parameters. A source whose
+    modification time and size have not changed keeps its recorded hash
+    without being read again.
+    """
+    def __init__(self, out_dir):
+        self.path = os.path.join(out_dir, MANIFEST_NAME)
+        # source path -> [mtime, size, hash]
+        self.sources = {}
+        # 'hash params' key -> output path
+        self.outputs = {}
+        self.hashed = 0
+        try:
+            f = open(self.path)
+            try:
+                data = json.load(f)
+            finally:
+                f.close()
+            if data.get('version') == MANIFEST_VERSION:
+                self.sources = data['sources']
+                self.outputs = data['outputs']
+        except (IOError, OSError, ValueError, KeyError):
+            # no manifest yet, or an unreadable one: everything is processed
+            pass
+
+    def source_hash(self, src):
+        """
+        Return the content hash of src, reusing the recorded one while the
+        modification time and size of src are unchanged
+        """
+        stat = os.stat(src)
+        recorded = self.sources.get(src)
+        if recorded is not None and recorded[0] == stat.st_mtime and recorded[1] == stat.st_size:
+            return recorded[2]
+        digest = content_hash(src)
+        self.hashed += 1
+        self.sources[src] = [stat.st_mtime, stat.st_size, digest]
+        return digest
+
+    def key(self, job):
+        src, dst, max_size = job
+        return '%s %s %s' % (self.source_hash(src), max_size, os.path.splitext(dst)[1].lower())
+
+    def is_current(self, job):
+        """
+        Return whether the output of job exists and was made from the same
+        content with the same parameters
+        """
+        try:
+            return self.outputs.get(self.key(job)) == job[1] and os.path.exists(job[1])
+        except (IOError, OSError):
+            return False
+
+    def record(self, job):
+        """
+        Record the output of job, after it was processed
+        """
+        self.outputs[self.key(job)] = job[1]
+
+    def save(self):
+        """
+        Write the manifest through a temporary file, so a crash never leaves a
+        partial one. It keeps the permissions of the manifest it replaces, or
+        gets those of a file made with open().
+        """
+        fd, temp_path = utils.makeTempFile(os.path.dirname(self.path), suffix='.tmp')
+        f = os.fdopen(fd, 'w')
+        try:
+            json.dump({'version': MANIFEST_VERSION, 'sources': self.sources, 'outputs': self.outputs}, f)
+        finally:
+            f.close()
+        # the temporary file was made with the permissions of a new file
+        if os.path.exists(self.path):
+            os.chmod(temp_path, os.stat(self.path).st_mode & 0o7777)
+            os.remove(self.path)
+        os.rename(temp_path, self.path)
+
+def python_executable():
+    """
+    Return the python the worker processes should run, or None when there is
+    none to run and the images are processed in this process. Inside the Maya
+    application, whose executable is not a python, that is mayapy: next to
+    it, or in Contents/bin of the application bundle on macOS.
+    """
+    if not sys.executable:
+        return None
+    name = os.path.basename(sys.executable).lower()
+    if not name.startswith('maya') or name.startswith('mayapy'):
+        return sys.executable
+    folder = os.path.dirname(sys.executable)
+    for candidate_folder in (folder, os.path.join(os.path.dirname(folder), 'bin')):
+        for candidate in ('mayapy.exe', 'mayapy'):
+            path = os.path.join(candidate_folder, candidate)
+            if os.path.isfile(path):
+                return path
+    return None
+
+def run_worker():
+    """
+    Entry point of a worker process: read [index, job] json lines from stdin
+    and write an [index, result] json line of process_image(job) to stdout
+    for each, until stdin is closed
+    """
+    stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+    stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+    for line in iter(stdin.readline, b''):
+        index, job = json.loads(line.decode('utf-8'))
+        result = process_image(tuple(job))
+        stdout.write((json.dumps([index, list(result)]) + '\n').encode('utf-8'))
+        stdout.flush()
+
+def start_worker():
+    """
+    Start a worker process running run_worker() in python_executable().
+    Raise OSError when it cannot be started.
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    module_name = os.path.splitext(os.path.basename(__file__))[0]
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([folder] + [path for path in [env.get('PYTHONPATH')] if path])
+    executable = python_executable()
+    if executable is None:
+        raise OSError('no python executable for the image workers')
+    command = [executable, '-c', 'import %s; %s.run_worker()' % (module_name, module_name)]
+    return subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+
+def serve_jobs(pending, results):
+    """
+    Feed the (index, job) pairs of the queue pending to one worker process,
+    one at a time, and put (index, result) on the queue results. A worker
+    that dies fails its job and is replaced, unless it died before finishing
+    any job or could not be started, then the jobs this thread takes fail
+    without a worker. Every job taken gets a result.
+    """
+    process = None
+    finished = 0
+    failure = 'image worker process exited'
+    try:
+        while True:
+            try:
+                index, job = pending.get_nowait()
+            except Empty:
+                return
+            if process is None and finished >= 0:
+                try:
+                    process = start_worker()
+                    finished = 0
+                except OSError as e:
+                    failure = 'image worker process could not start: %s' % e
+                    finished = -1
+            line = None
+            if process is not None:
+                try:
+                    process.stdin.write((json.dumps([index, list(job)]) + '\n').encode('utf-8'))
+                    process.stdin.flush()
+                    line = process.stdout.readline()
+                except (IOError, OSError):
+                    line = None
+            if line:
+                results.put(tuple(json.loads(line.decode('utf-8'))))
+                finished += 1
+                continue
+            results.put((index, (job[0], job[1], False, failure)))
+            if process is not None:
+                process.wait()
+                # a worker that cannot finish a single job is not started again
+                finished = 0 if finished else -1
+                process = None
+    finally:
+        if process is not None:
+            process.stdin.close()
+            process.wait()
+
+def iter_processed(jobs, workers=None):
+    """
+    Generate the process_image() result of every job as it finishes, in a pool
+    of at most workers processes, by default one per CPU
+
+    jobs = list of (src, dst, max_size)
+    """
+    if not jobs:
+        return
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, len(jobs)))
+    if workers == 1 or python_executable() is None:
+        for job in jobs:
+            yield process_image(job)
+        return
+    # workers are started with subprocess rather than a multiprocessing pool,
+    # which would fork the whole Maya process on linux and macOS
+    pending = Queue()
+    for index, job in enumerate(jobs):
+        pending.put((index, job))
+    results = Queue()
+    # a thread per worker process, waiting on its pipes
+    threads = [threading.Thread(target=serve_jobs, args=(pending, results)) for i in range(workers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    try:
+        for i in range(len(jobs)):
+            index, result = results.get()
+            # the paths as given, not as they came back through json
+            job = jobs[index]
+            yield (job[0], job[1], result[2], result[3])
+    finally:
+        # when the caller stops early, let the workers finish their current job only
+        while True:
+            try:
+                pending.get_nowait()
+            except Empty:
+                break
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,61 @@
+"""
+Stand-in for P_maya_Process_textures.py, to test P_maya_Process_batch.py
+without Maya.
+
+    python P_maya_Process_batch.py shot010.json --module P_maya_Process_standin --no-maya
+
+A scene is a json file {"images": [paths], "delay": seconds}. Its images are
+processed by P_maya_Process_images the way the real module does it, waiting
+delay seconds after each one, and the new scene file lists the outputs.
+Nothing in this module imports Maya.
+"""
+import os
+import json
+import time
+
+import P_maya_Process_images as process_images
+
+# the scene opened by open_scene()
+scene = {}
+
+def open_scene(path):
+    """
+    Read the scene file at path in place of maya.cmds.file(open=True)
+
+    path = path of the json scene file (string)
+    """
+    f = open(path)
+    try:
+        data = json.load(f)
+    finally:
+        f.close()
+    scene.clear()
+    scene.update(data)
+
+def process_all_textures(out_dir, new_file, workers=None, cleanup=False):
+    """
+    Process the images of the open scene into out_dir and save the scene there
+    as new_file. Return (processed, errors, skipped) like the real module.
+
+    out_dir = output folder (string)
+    new_file = name of the scene file (string)
+    workers = number of image processing processes, None for one per CPU (int)
+    cleanup = accepted for the real module's signature, nothing to delete here (bool)
+    """
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    jobs = [(src, process_images.output_path(src, out_dir), None) for src in scene.get('images', [])]
+    processed = []
+    errors = []
+    for src, dst, ok, message in process_images.iter_processed(jobs, workers):
+        if ok:
+            processed.append(dst)
+        else:
+            errors.append(src)
+        time.sleep(scene.get('delay', 0))
+    f = open(os.path.join(out_dir, new_file), 'w')
+    try:
+        json.dump({'images': processed}, f)
+    finally:
+        f.close()
+    return (processed, errors, [])
@@ -1,158 +1,429 @@
-import os
-import maya.cmds
-import maya.mel
-
-def process_all_textures(out_dir = os.getenv('HOME'), new_file = 'processed.ma'):
-    """
-    A function that gets a list of textures from the current scene
-    and processes each texture according to name
-    
-    out_dir = Home directory (string)
-    new_file = Name of the scene file (string)
-    """
-    # create a list of valid file texture nodes in the scene
-    texture_nodes = [i for i in maya.cmds.ls(type='file') if is_valid_texture(i)]
-    
-    # initialize variables
-    processed_textures = []
-    error_textures = []
-    skipped_textures = []
-    
-    # if no file texture nodes found in scene, print warning, and return
-    if not texture_nodes:
-        maya.cmds.warning('No textures found, exiting')
-        return (processed_textures, error_textures, skipped_textures)
-    
-    # iterate through file texture nodes
-    for name in texture_nodes:
-        # print file texture name
-        print 'Processing texture', name
-        as_type = None
-        status = False
-        texture = None
-        
-        # check the end suffix, set appropriate flag
-        if '_diff' in name:
-            status, texture = process_diffuse(name, out_dir)
-            if status:
-                processed_textures.append(texture)
-                as_type = 'diffuse'
-            else:
-                error_textures.append(texture)
-        elif '_spec' in name:
-            status, texture = process_diffuse(name, out_dir)
-            if status:
-                processed_textures.append(texture)
-                as_type = 'specular'
-            else:
-                error_textures.append(texture)
-        elif '_bump' in name:
-            status, texture = process_diffuse(name, out_dir)
-            if status:
-                processed_textures.append(texture)
-                as_type = 'bump'
-            else:
-                error_textures.append(texture)
-                
-        # if status return, proceed accordingly and print the file texture name and its type
-        if status:
-            print 'Processed %s as a %s texture' % (texture, as_type)
-        else:
-            print 'Failed to process %s' % name
-    try:
-        # Rename the scene file with its directory path
-        maya.cmds.file(rename=os.path.join(out_dir, new_file))
-        # Try saving the file
-        maya.cmds.file(save=True)
-    except:
-        # On error saving, print message
-        print 'Error saving file, %s not saved.' % new_file
-    finally:
-        return (processed_textures, error_textures, skipped_textures)
-
-def is_valid_texture(file_node):
-    """
-    Return whether or not the specified file node is actually connected to any models
-    
-    file_node = name of the file texture node (string or unicode)
-    """
-    # Returns a list of shaders having incoming connection from outColor of the file node
-    shaders = maya.cmds.listConnections('%s.outColor' % file_node, destination=True)
-    if not shaders:
-        return False
-    for shader in shaders:
-        # Returns a list of shading groups having incoming connection from outColor of the shader node
-        groups = maya.cmds.listConnections('%s.outColor' % shader)
-        if not groups:
-            return False
-        for group in groups:
-            # Returns a list of shape nodes (nodeType=mesh) connected to a SG
-            meshes = maya.cmds.listConnections(group, type='mesh')
-            if meshes:
-                # Then it checks if the file node texture is either diffuse, bump or specular.
-                if '_diff' in file_node:
-                    return True
-                elif '_spec' in file_node:
-                    return True
-                elif '_bump' in file_node:
-                    return True
-    return False
-
-def process_diffuse(file_node, out_dir):
-    """
-    Process a file node's texture, reassign the new texture and return a status
-    and texture name.
-    
-    file_node = Name of the texture file node (string or unicode)
-    out_dir = Home directory (string)
-    """
-    status = False
-    texture = None
-    # get the name of the image file in the file texture node (fileTextureName (ftn))
-    file_name = maya.cmds.getAttr('%s.ftn' % file_node)
-    meshes = []
-    # get the list of all shaders connected from the file texture node
-    shaders = maya.cmds.listConnections('%s.outColor'% file_node, destination=True)
-    if shaders:
-        for s in shaders:
-            # get a list of shading groups connected from the shader
-            groups = maya.cmds.listConnections('%s.outColor'%s)
-            if groups:
-                for g in groups:
-                    # get a list of shape nodes connected from the shading group
-                    m = maya.cmds.listConnections(g, type='mesh')
-                    if m:
-                        meshes += m
-    try:
-        # processing code would be here
-        new_file_name = file_name
-        
-        # Create a new blinn shader and assign a name
-        shader = maya.cmds.shadingNode('blinn', asShader=True)
-        
-        # Create a set renderable set, an empty shading group
-        shading_group = maya.cmds.sets(renderable=True, noSurfaceShader=True, empty=True)
-        
-        # Connect the shader to the shading group
-        maya.cmds.connectAttr(shader + '.outColor', shading_group + '.surfaceShader')
-        
-        # create a place2dTexture node along with a file texture node. It like clicking the file node
-        # in hypershade to create a new one. It automatically creates and connects a place2dTexture node.
-        texture = maya.mel.eval('createRenderNodeCB -as2DTexture ""file""')
-        
-        # Put the name of the image file in the texture file node
-        maya.cmds.setAttr(texture + '.ftn', new_file_name, type='string')
-        
-        # Connect the file texture node to the shader
-        maya.cmds.connectAttr(texture + '.outColor', shader + '.color')
-        
-        # Assign the shading group to the meshes
-        for mesh in meshes:
-            maya.cmds.sets(mesh, edit=True, forceElement=shading_group)
-        status=True
-    except:
-        texture = file_node
-        status = False
-    return (status, texture)
-        
-    
+import os
+import itertools
+import maya.cmds
+import maya.mel
+# image resizing and conversion in worker processes
+import P_maya_Process_images as process_images
+
+# number of scene queries made through list_connections since the last reset
+scene_queries = 0
+# nodes in the network process_diffuse creates: blinn, shading group, file, place2dTexture
+NODES_PER_NETWORK = 4
+# Maya's bookkeeping nodes: a connection to one of them does not make a node used.
+# Not every Maya version has all of these types
+BOOKKEEPING_TYPES = ['defaultShaderList', 'defaultTextureList', 'defaultRenderUtilityList',
+                     'materialInfo', 'renderPartition', 'lightLinker', 'nodeGraphEditorInfo', 'hyperLayout']
+
+def list_connections(*args, **kwargs):
+    """
+    maya.cmds.listConnections, counted in scene_queries. Always returns a list.
+    """
+    global scene_queries
+    scene_queries += 1
+    return maya.cmds.listConnections(*args, **kwargs) or []
+
+def build_shading_index(file_nodes):
+    """
+    Return a dict of file node -> {'shaders': [...], 'groups': [...], 'meshes': [...]}
+    for the shaders fed by each file node's outColor, their shading groups and
+    the meshes in those groups. Each level of the graph is read with a single
+    query for all the nodes, whatever their number.
+    
+    file_nodes = names of the file texture nodes (list)
+    """
+    index = dict((node, {'shaders': [], 'groups': [], 'meshes': []}) for node in file_nodes)
+    shaders, groups, meshes = walk_shading_graph(file_nodes)
+    for node in file_nodes:
+        entry = index[node]
+        for shader in shaders.get(node, []):
+            entry['shaders'].append(shader)
+            for group in groups.get(shader, []):
+                entry['groups'].append(group)
+                entry['meshes'] += meshes.get(group, [])
+    return index
+
+def walk_shading_graph(file_nodes):
+    """
+    Return three dicts: file node -> shaders, shader -> shading groups and
+    shading group -> meshes, with one query per level
+    
+    file_nodes = names of the file texture nodes (list)
+    """
+    if not file_nodes:
+        return ({}, {}, {})
+    # file -> shaders, connections=True pairs each source plug with a destination node
+    pairs = list_connections(['%s.outColor' % node for node in file_nodes], source=False, destination=True, connections=True)
+    shaders = {}
+    for plug, shader in zip(pairs[::2], pairs[1::2]):
+        shaders.setdefault(plug.split('.')[0], []).append(shader)
+    # shader -> shading groups
+    all_shaders = sorted(set(shader for found in shaders.values() for shader in found))
+    groups = {}
+    if all_shaders:
+        pairs = list_connections(['%s.outColor' % shader for shader in all_shaders], source=False, destination=True, connections=True)
+        for plug, group in zip(pairs[::2], pairs[1::2]):
+            groups.setdefault(plug.split('.')[0], []).append(group)
+    # shading group -> meshes
+    all_groups = sorted(set(group for found in groups.values() for group in found))
+    meshes = {}
+    if all_groups:
+        pairs = list_connections(all_groups, type='mesh', connections=True)
+        for plug, mesh in zip(pairs[::2], pairs[1::2]):
+            meshes.setdefault(plug.split('.')[0], []).append(mesh)
+    return (shaders, groups, meshes)
+
+def collect_orphans(candidates):
+    """
+    Return the nodes of candidates, and the place2dTexture nodes feeding them,
+    that are no longer used: shading groups without members, of any geometry
+    type, and other nodes whose outputs only go to Maya's bookkeeping nodes
+    or to other orphans. Maya's default nodes are never returned.
+    
+    candidates = names of the nodes process_diffuse replaced (list)
+    """
+    defaults = set(maya.cmds.ls(defaultNodes=True) or [])
+    candidates = set(candidates) - defaults
+    if not candidates:
+        return []
+    # placements are only candidates through the file nodes they feed
+    pairs = list_connections(sorted(candidates), source=True, destination=False, type='place2dTexture',
+                             connections=True)
+    candidates.update(node for node in pairs[1::2] if node not in defaults)
+    # a shading group is used by its members
+    groups = set(maya.cmds.ls(sorted(candidates), type='shadingEngine') or [])
+    orphans = set(group for group in groups if not maya.cmds.sets(group, query=True))
+    # any other node by the nodes it feeds, bookkeeping aside
+    others = candidates - groups
+    feeds = dict((node, set()) for node in others)
+    # an empty node list would make listConnections read the selection
+    pairs = []
+    if others:
+        pairs = list_connections(sorted(others), source=False, destination=True, connections=True)
+    # ls fails on a type this Maya version does not know
+    installed = set(maya.cmds.allNodeTypes() or [])
+    types = [node_type for node_type in BOOKKEEPING_TYPES if node_type in installed]
+    bookkeeping = set()
+    if pairs and types:
+        bookkeeping = set(maya.cmds.ls(sorted(set(pairs[1::2])), type=types) or [])
+    for plug, node in zip(pairs[::2], pairs[1::2]):
+        if node not in bookkeeping:
+            feeds[plug.split('.')[0]].add(node)
+    # a node feeding only orphans is one too, until nothing changes
+    changed = True
+    while changed:
+        changed = False
+        for node in others - orphans:
+            if feeds[node] <= orphans:
+                orphans.add(node)
+                changed = True
+    return sorted(orphans)
+
+def delete_orphans(candidates):
+    """
+    Delete the nodes collect_orphans() finds among candidates in one batch and
+    return their number
+    
+    candidates = names of the nodes process_diffuse replaced (list)
+    """
+    orphans = collect_orphans(candidates)
+    if orphans:
+        maya.cmds.delete(orphans)
+    return len(orphans)
+
+def legacy_query_count(index):
+    """
+    Return the number of listConnections calls the per texture walk, once in
+    is_valid_texture and again in process_diffuse, made for the nodes of index
+    """
+    count = 0
+    for node, entry in index.items():
+        # file -> shaders, then one query per shader and one per shading group
+        walk = 1 + len(entry['shaders']) + len(entry['groups'])
+        count += 2 * walk if entry['meshes'] else walk
+    return count
+
+def process_all_textures(out_dir = os.getenv('HOME'), new_file = 'processed.ma', max_size = None,
+                         image_format = None, workers = None, cleanup = False):
+    """
+    A function that gets a list of textures from the current scene
+    and processes each texture according to name
+    
+    out_dir = Home directory (string)
+    new_file = Name of the scene file (string)
+    max_size = Longest side of the processed images in pixels, None keeps their size (int)
+    image_format = Extension of the processed images, e.g. '.png', None keeps theirs (string)
+    workers = Number of image processing processes, None for one per CPU (int)
+    cleanup = Delete the networks the processed textures replaced, once nothing uses them, before saving (bool)
+    """
+    global scene_queries
+    scene_queries = 0
+    scene_path = maya.cmds.file(query=True, sceneName=True)
+    # map every file texture node to its shaders, shading groups and meshes once
+    index = build_shading_index(maya.cmds.ls(type='file'))
+    print 'Shading graph indexed with %d scene queries, the per texture walk needed %d' % (
+        scene_queries, legacy_query_count(index))
+    # create a list of valid file texture nodes in the scene
+    texture_nodes = [i for i in index if is_valid_texture(i, index)]
+    
+    # initialize variables
+    processed_textures = []
+    error_textures = []
+    skipped_textures = []
+    
+    # if no file texture nodes found in scene, print warning, and return
+    if not texture_nodes:
+        maya.cmds.warning('No textures found, exiting')
+        return (processed_textures, error_textures, skipped_textures)
+    
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    # one image job per source image, however many file nodes use it
+    jobs = {}
+    nodes_by_image = {}
+    used = set()
+    for name in texture_nodes:
+        src = maya.cmds.getAttr('%s.ftn' % name)
+        if src not in jobs:
+            dst = process_images.output_path(src, out_dir, image_format)
+            # two sources with the same file name must not overwrite each other
+            stem, ext = os.path.splitext(dst)
+            count = 1
+            while dst in used:
+                dst = '%s_%d%s' % (stem, count, ext)
+                count += 1
+            used.add(dst)
+            jobs[src] = (src, dst, max_size)
+        nodes_by_image.setdefault(src, []).append(name)
+    
+    # images made earlier from the same content with the same parameters are reused
+    manifest = process_images.Manifest(out_dir)
+    cached = []
+    pending = []
+    for job in jobs.values():
+        if manifest.is_current(job):
+            cached.append(job)
+        else:
+            pending.append(job)
+    print '%d images unchanged (cache hits), %d to process, %d sources hashed' % (
+        len(cached), len(pending), manifest.hashed)
+    results = [(src, dst, True, 'cached') for src, dst, max_size in cached]
+    
+    # one network per (image, texture type), with the meshes assigned in bulk at the end
+    materials = {}
+    assignments = {}
+    # the old file nodes, shaders and shading groups of the rewired textures
+    replaced = set()
+    
+    # the images are processed in worker processes, the scene is only rewired
+    # here on the main thread, as each image is done
+    for src, dst, ok, message in itertools.chain(results, process_images.iter_processed(pending, workers)):
+        if ok and message != 'cached':
+            manifest.record(jobs[src])
+        if not ok:
+            print 'Failed to process image %s: %s' % (src, message)
+            for name in nodes_by_image[src]:
+                print 'Failed to process %s' % name
+                error_textures.append(name)
+            continue
+        for name in nodes_by_image[src]:
+            rewire_texture(name, dst, out_dir, index, processed_textures, error_textures, materials, assignments,
+                           replaced)
+    assign_meshes(assignments)
+    reused = len(processed_textures) - len(materials)
+    print '%d shading networks for %d textures, %d nodes saved by reusing networks' % (
+        len(materials), len(processed_textures), reused * NODES_PER_NETWORK)
+    
+    if cleanup:
+        nodes_before = len(maya.cmds.ls())
+        deleted = delete_orphans(sorted(replaced))
+        print 'Deleted %d orphaned shading nodes, scene nodes %d -> %d' % (
+            deleted, nodes_before, len(maya.cmds.ls()))
+    try:
+        manifest.save()
+    except (IOError, OSError):
+        print 'Error saving the texture manifest in %s' % out_dir
+    try:
+        # Rename the scene file with its directory path
+        maya.cmds.file(rename=os.path.join(out_dir, new_file))
+        # Try saving the file
+        maya.cmds.file(save=True)
+        if cleanup and scene_path and os.path.exists(scene_path):
+            print 'Scene file size %d -> %d bytes' % (
+                os.path.getsize(scene_path), os.path.getsize(os.path.join(out_dir, new_file)))
+    except:
+        # On error saving, print message
+        print 'Error saving file, %s not saved.' % new_file
+    finally:
+        return (processed_textures, error_textures, skipped_textures)
+
+def rewire_texture(name, new_file_name, out_dir, index, processed_textures, error_textures,
+                   materials=None, assignments=None, replaced=None):
+    """
+    Rewire a file texture node to its processed image according to name, and
+    record the result in processed_textures or error_textures
+    
+    name = name of the file texture node (string or unicode)
+    new_file_name = path of the processed image (string)
+    out_dir = Home directory (string)
+    index = shading graph index from build_shading_index()
+    materials, assignments, replaced = passed on to process_diffuse()
+    """
+    # print file texture name
+    print 'Processing texture', name
+    as_type = None
+    status = False
+    texture = None
+    
+    # check the end suffix, set appropriate flag
+    if '_diff' in name:
+        status, texture = process_diffuse(name, out_dir, index, new_file_name, 'diffuse', materials, assignments,
+                                           replaced)
+        if status:
+            processed_textures.append(texture)
+            as_type = 'diffuse'
+        else:
+            error_textures.append(texture)
+    elif '_spec' in name:
+        status, texture = process_diffuse(name, out_dir, index, new_file_name, 'specular', materials, assignments,
+                                           replaced)
+        if status:
+            processed_textures.append(texture)
+            as_type = 'specular'
+        else:
+            error_textures.append(texture)
+    elif '_bump' in name:
+        status, texture = process_diffuse(name, out_dir, index, new_file_name, 'bump', materials, assignments,
+                                           replaced)
+        if status:
+            processed_textures.append(texture)
+            as_type = 'bump'
+        else:
+            error_textures.append(texture)
+            
+    # if status return, proceed accordingly and print the file texture name and its type
+    if status:
+        print 'Processed %s as a %s texture' % (texture, as_type)
+    else:
+        print 'Failed to process %s' % name
+
+def is_valid_texture(file_node, index=None):
+    """
+    Return whether or not the specified file node is actually connected to any models
+    
+    file_node = name of the file texture node (string or unicode)
+    index = shading graph index from build_shading_index(), built for file_node if None
+    """
+    if index is None:
+        index = build_shading_index([file_node])
+    # the file node must reach a mesh through a shader and a shading group
+    if not index[file_node]['meshes']:
+        return False
+    # Then it checks if the file node texture is either diffuse, bump or specular.
+    if '_diff' in file_node:
+        return True
+    elif '_spec' in file_node:
+        return True
+    elif '_bump' in file_node:
+        return True
+    return False
+
+def process_diffuse(file_node, out_dir, index=None, new_file_name=None, as_type=None,
+                    materials=None, assignments=None, replaced=None):
+    """
+    Process a file node's texture, reassign the new texture and return a status
+    and texture name.
+    
+    file_node = Name of the texture file node (string or unicode)
+    out_dir = Home directory (string)
+    index = shading graph index from build_shading_index(), built for file_node if None
+    new_file_name = path of the processed image, None keeps the node's image (string)
+    as_type = texture type, 'diffuse', 'specular' or 'bump' (string)
+    materials = networks already made, (image path, texture type) -> (shader, shading group,
+                texture); a network with the same key is reused and new ones are added (dict)
+    assignments = shading group -> meshes to assign later with assign_meshes(), None
+                  assigns the meshes right away (dict)
+    replaced = receives the file node, shaders and shading groups the meshes are
+               taken from, the candidates for delete_orphans() (set)
+    """
+    status = False
+    texture = None
+    # get the name of the image file in the file texture node (fileTextureName (ftn))
+    file_name = maya.cmds.getAttr('%s.ftn' % file_node)
+    if index is None:
+        index = build_shading_index([file_node])
+    # the meshes reached from the file texture node through its shaders and shading groups
+    meshes = list(index[file_node]['meshes'])
+    old_network = [file_node] + index[file_node]['shaders'] + index[file_node]['groups']
+    try:
+        # the image itself was processed by P_maya_Process_images
+        if new_file_name is None:
+            new_file_name = file_name
+        
+        # reuse the network made for the same image and texture type
+        key = (new_file_name, as_type)
+        if materials is not None and key in materials:
+            shader, shading_group, texture = materials[key]
+            if assignments is not None:
+                assignments.setdefault(shading_group, []).extend(meshes)
+            elif meshes:
+                maya.cmds.sets(meshes, edit=True, forceElement=shading_group)
+            if replaced is not None:
+                replaced.update(old_network)
+            return (True, texture)
+        
+        # Create a new blinn shader and assign a name
+        shader = maya.cmds.shadingNode('blinn', asShader=True)
+        
+        # Create a set renderable set, an empty shading group
+        shading_group = maya.cmds.sets(renderable=True, noSurfaceShader=True, empty=True)
+        
+        # Connect the shader to the shading group
+        maya.cmds.connectAttr(shader + '.outColor', shading_group + '.surfaceShader')
+        
+        # create a place2dTexture node along with a file texture node. It like clicking the file node
+        # in hypershade to create a new one. It automatically creates and connects a place2dTexture node.
+        texture = maya.mel.eval('createRenderNodeCB -as2DTexture ""file""')
+        
+        # Put the name of the image file in the texture file node
+        maya.cmds.setAttr(texture + '.ftn', new_file_name, type='string')
+        
+        # Connect the file texture node to the shader
+        maya.cmds.connectAttr(texture + '.outColor', shader + '.color')
+        
+        if materials is not None:
+            materials[key] = (shader, shading_group, texture)
+        
+        # Assign the shading group to all the meshes at once, or leave it to assign_meshes()
+        if assignments is not None:
+            assignments.setdefault(shading_group, []).extend(meshes)
+        elif meshes:
+            maya.cmds.sets(meshes, edit=True, forceElement=shading_group)
+        if replaced is not None:
+            replaced.update(old_network)
+        status=True
+    except:
+        texture = file_node
+        status = False
+    return (status, texture)
+        
+    
+
+def assign_meshes(assignments):
+    """
+    Assign meshes to shading groups with one sets command per shading group.
+    Return the number of meshes that could not be assigned.
+    
+    assignments = shading group -> list of meshes (dict)
+    """
+    failed = 0
+    for shading_group, meshes in assignments.items():
+        # a mesh reached through several of its old shaders is assigned once
+        meshes = sorted(set(meshes))
+        if not meshes:
+            continue
+        try:
+            maya.cmds.sets(meshes, edit=True, forceElement=shading_group)
+        except RuntimeError:
+            print 'Failed to assign %d meshes to %s' % (len(meshes), shading_group)
+            failed += len(meshes)
+    return failed
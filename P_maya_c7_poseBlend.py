@@ -0,0 +1,76 @@
+"""
+Pose blending for the pose manager (P_maya_c7_poseMgr.py).
+
+PoseBlender aligns the channels of two or more poses once, into one value
+array per pose, so that every blend after that, e.g. on each tick of a
+slider, is a single weighted sum over those arrays.
+
+Nothing in this module imports Maya.
+"""
+import P_maya_c7_poseFile as poseFile
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class PoseBlender(object):
+    """
+    Weighted blends of a fixed list of pose dicts
+    """
+    def __init__(self, poses):
+        """
+        Align poses, a list of dicts of node -> [[attr, value], ...]. The
+        channels are the union of those of all the poses, in first seen order.
+        A pose missing a channel takes the value of the first pose that has it,
+        so it does not pull the blend towards zero.
+        """
+        self.channels = []
+        positions = {}
+        rows = []
+        for pose in poses:
+            row = {}
+            for node, attr, value in poseFile.iterChannels(pose):
+                key = (node, attr)
+                if key not in positions:
+                    positions[key] = len(self.channels)
+                    self.channels.append(key)
+                row[positions[key]] = float(value)
+            rows.append(row)
+        fill = [None] * len(self.channels)
+        for row in rows:
+            for i, value in row.items():
+                if fill[i] is None:
+                    fill[i] = value
+        values = [[row.get(i, fill[i]) for i in range(len(self.channels))] for row in rows]
+        self.numPoses = len(rows)
+        if numpy is not None:
+            self.values = numpy.array(values, dtype=numpy.float64).reshape(len(rows), len(self.channels))
+        else:
+            self.values = values
+
+    def blend(self, weights):
+        """
+        Return the blended values, one per channel in self.channels order.
+        weights holds one weight per pose and is used as is; pass weights that
+        sum to 1 for an interpolation.
+        """
+        if len(weights) != self.numPoses:
+            raise ValueError('Expected %d weights, got %d' % (self.numPoses, len(weights)))
+        if numpy is not None:
+            return numpy.dot(numpy.asarray(weights, dtype=numpy.float64), self.values)
+        result = [0.0] * len(self.channels)
+        for weight, row in zip(weights, self.values):
+            if weight:
+                for i, value in enumerate(row):
+                    result[i] += weight * value
+        return result
+
+    def blendPose(self, weights):
+        """
+        Return the blend as a pose dict of node -> [[attr, value], ...]
+        """
+        data = {}
+        for (node, attr), value in zip(self.channels, self.blend(weights)):
+            data.setdefault(node, []).append([attr, float(value)])
+        return data
@@ -0,0 +1,244 @@
+"""
+Animation clip files for the pose manager (P_maya_c7_poseMgr.py).
+
+A clip stores, for every channel of a hierarchy over a frame range, either the
+static value of an unanimated channel or the keys of its animation curve.
+Keys are reduced before they are written: held runs whose tangents keep the
+curve level collapse to their ends, and a curve that never moves more than
+the tolerance keeps a single key.
+Curve values are quantized to the tolerance. Size and time therefore scale
+with the number of keys, not with frames times attributes.
+
+    header    '<4sHHddd': magic 'ARCL', version, flags, start, end, tolerance
+    strings   '<I' byte length, then '<I' node count, '<I' attribute count and
+              the null terminated utf-8 node and attribute names
+    channels  '<I' channel count, then per channel
+              '<IIBBI' node index, attribute index, kind, curve type, key count
+              kind 0 (static): one '<d' value in UI units
+              kind 1 (curve): key times '<f' frames, a '<B' flag then values,
+              '<i' steps of the tolerance or '<d' if the flag is 0, then '<B'
+              in and out tangent types, then '<f' in x, in y, out x, out y
+              tangents
+
+Nothing in this module imports Maya.
+"""
+import struct, io, sys, time
+
+import P_maya_c7_poseFile as poseFile
+
+kMagic = b'ARCL'
+kVersion = 1
+kHeader = struct.Struct('<4sHHddd')
+kCount = struct.Struct('<I')
+kChannelHeader = struct.Struct('<IIBBI')
+kStatic = 0
+kCurve = 1
+# quantized values must fit a signed 32 bit step count
+kMaxSteps = 2 ** 31 - 1
+# MFnAnimCurve tangent types that never overshoot the keys they join:
+# kTangentLinear, kTangentFlat, kTangentStep and kTangentStepNext
+kLevelTangents = (2, 3, 5, 10)
+
+class ClipChannel(object):
+    """
+    One channel of a clip: the value of an unanimated channel, in UI units, or
+    the keys of an animation curve, in the curve's internal units. curveType is
+    the MFnAnimCurve type of the curve and key times are in frames.
+    """
+    def __init__(self, node, attr, value=None, curveType=0, times=None, values=None,
+                 inTypes=None, outTypes=None, tangents=None):
+        self.node = node
+        self.attr = attr
+        self.value = value
+        self.curveType = curveType
+        self.times = times or []
+        self.values = values or []
+        self.inTypes = inTypes or []
+        self.outTypes = outTypes or []
+        # per key (in x, in y, out x, out y)
+        self.tangents = tangents or []
+
+    def isStatic(self):
+        return not self.times
+
+    def numKeys(self):
+        return len(self.times)
+
+    def reduce(self, tolerance):
+        """
+        Drop the inner keys of held runs, keeping the first and last key of
+        each run, and the keys after the first of a curve that stays within
+        tolerance. A key is only dropped when it and the next key stay within
+        tolerance of the last key kept, and the tangents on both sides of it
+        are level ones, so the curve joining the remaining keys cannot
+        overshoot. A curve only collapses to one key when all its tangents
+        are level. Spline, auto and other tangents shaped by their
+        neighbours keep every key.
+        """
+        if self.isStatic():
+            return
+        values = self.values
+        if (max(values) - min(values) <= tolerance and
+                all([t in kLevelTangents for t in self.inTypes + self.outTypes])):
+            keep = [0]
+        else:
+            keep = [0]
+            for i in range(1, len(values) - 1):
+                held = (abs(values[i] - values[keep[-1]]) <= tolerance and
+                        abs(values[i + 1] - values[keep[-1]]) <= tolerance)
+                level = (self.outTypes[i - 1] in kLevelTangents and self.inTypes[i] in kLevelTangents and
+                         self.outTypes[i] in kLevelTangents and self.inTypes[i + 1] in kLevelTangents)
+                if not (held and level):
+                    keep.append(i)
+            keep.append(len(values) - 1)
+        self.times = [self.times[i] for i in keep]
+        self.values = [self.values[i] for i in keep]
+        self.inTypes = [self.inTypes[i] for i in keep]
+        self.outTypes = [self.outTypes[i] for i in keep]
+        self.tangents = [self.tangents[i] for i in keep]
+
+class Clip(object):
+    """
+    The channels of a hierarchy over the frame range start to end
+    """
+    def __init__(self, start, end, tolerance=1e-4, channels=None):
+        self.start = start
+        self.end = end
+        self.tolerance = tolerance
+        self.channels = channels or []
+
+    def numKeys(self):
+        return sum([channel.numKeys() for channel in self.channels])
+
+    def reduce(self):
+        for channel in self.channels:
+            channel.reduce(self.tolerance)
+
+def writeClip(f, clip):
+    """
+    Reduce clip and write it to the binary file object f
+    """
+    clip.reduce()
+    nodes = []
+    attrs = []
+    nodeIndex = {}
+    attrIndex = {}
+    for channel in clip.channels:
+        if channel.node not in nodeIndex:
+            nodeIndex[channel.node] = len(nodes)
+            nodes.append(channel.node)
+        if channel.attr not in attrIndex:
+            attrIndex[channel.attr] = len(attrs)
+            attrs.append(channel.attr)
+    names = b''.join([poseFile._encode(name) + b'\0' for name in nodes + attrs])
+    out = [kHeader.pack(kMagic, kVersion, 0, clip.start, clip.end, clip.tolerance),
+           kCount.pack(len(names)), kCount.pack(len(nodes)), kCount.pack(len(attrs)), names,
+           kCount.pack(len(clip.channels))]
+    step = clip.tolerance
+    for channel in clip.channels:
+        kind = kStatic if channel.isStatic() else kCurve
+        out.append(kChannelHeader.pack(nodeIndex[channel.node], attrIndex[channel.attr], kind,
+                                       channel.curveType, channel.numKeys()))
+        if kind == kStatic:
+            out.append(struct.pack('<d', channel.value))
+            continue
+        count = channel.numKeys()
+        out.append(struct.pack('<%df' % count, *channel.times))
+        out.append(_packValues(channel.values, step))
+        out.append(struct.pack('<%dB' % count, *channel.inTypes))
+        out.append(struct.pack('<%dB' % count, *channel.outTypes))
+        flat = [c for tangent in channel.tangents for c in tangent]
+        out.append(struct.pack('<%df' % len(flat), *flat))
+    f.write(b''.join(out))
+
+def readClip(f):
+    """
+    Read a clip from the binary file object f
+    """
+    data = f.read()
+    magic, version, flags, start, end, tolerance = kHeader.unpack_from(data, 0)
+    if magic != kMagic:
+        raise ValueError('Not a clip file')
+    if version != kVersion:
+        raise ValueError('Clip format version %d, expected %d' % (version, kVersion))
+    offset = kHeader.size
+    namesLength, numNodes, numAttrs = struct.unpack_from('<III', data, offset)
+    offset += 3 * kCount.size
+    names = [poseFile._decode(name) for name in data[offset:offset + namesLength].split(b'\0')[:-1]]
+    offset += namesLength
+    nodes = names[:numNodes]
+    attrs = names[numNodes:numNodes + numAttrs]
+    numChannels = kCount.unpack_from(data, offset)[0]
+    offset += kCount.size
+    clip = Clip(start, end, tolerance)
+    for c in range(numChannels):
+        nodeId, attrId, kind, curveType, count = kChannelHeader.unpack_from(data, offset)
+        offset += kChannelHeader.size
+        channel = ClipChannel(nodes[nodeId], attrs[attrId], curveType=curveType)
+        if kind == kStatic:
+            channel.value = struct.unpack_from('<d', data, offset)[0]
+            offset += 8
+        else:
+            channel.times = list(struct.unpack_from('<%df' % count, data, offset))
+            offset += 4 * count
+            channel.values, offset = _unpackValues(data, offset, count, tolerance)
+            channel.inTypes = list(struct.unpack_from('<%dB' % count, data, offset))
+            offset += count
+            channel.outTypes = list(struct.unpack_from('<%dB' % count, data, offset))
+            offset += count
+            flat = struct.unpack_from('<%df' % (4 * count), data, offset)
+            offset += 16 * count
+            channel.tangents = [tuple(flat[i:i + 4]) for i in range(0, len(flat), 4)]
+        clip.channels.append(channel)
+    return clip
+
+def benchmark(numChannels=2000, numFrames=240, keyEvery=6, stream=sys.stdout):
+    """
+    Write and read a clip of numChannels curves keyed every keyEvery frames
+    over numFrames frames, with runs of four held keys on flat tangents, and
+    compare its size with one '<d' per channel per frame. Return a dict of the
+    measurements.
+    """
+    clip = Clip(1.0, float(numFrames))
+    for c in range(numChannels):
+        times = [float(t) for t in range(1, numFrames + 1, keyEvery)]
+        values = [(c % 7) * 0.5 + (i // 4) * 0.25 for i in range(len(times))]
+        clip.channels.append(ClipChannel('ctrl_%04d' % (c // 10), 'attr%d' % (c % 10), curveType=1,
+                                         times=times, values=values, inTypes=[3] * len(times),
+                                         outTypes=[3] * len(times), tangents=[(1.0, 0.0, 1.0, 0.0)] * len(times)))
+    numKeys = clip.numKeys()
+    f = io.BytesIO()
+    start = time.time()
+    writeClip(f, clip)
+    writeTime = time.time() - start
+    start = time.time()
+    f.seek(0)
+    loaded = readClip(f)
+    readTime = time.time() - start
+    results = {'keys': numKeys, 'reducedKeys': loaded.numKeys(), 'clipBytes': len(f.getvalue()),
+               'denseBytes': numChannels * numFrames * 8, 'write': writeTime, 'read': readTime}
+    stream.write('%(keys)d keys reduced to %(reducedKeys)d, %(clipBytes)d bytes '
+                 '(%(denseBytes)d sampled per frame), write %(write).3fs, read %(read).3fs\n' % results)
+    return results
+
+def _packValues(values, step):
+    """
+    Pack curve values as '<i' multiples of step, or '<d' without a step or
+    when a value is out of range for the quantization
+    """
+    if step > 0:
+        steps = [int(round(value / step)) for value in values]
+        if max([abs(s) for s in steps]) <= kMaxSteps:
+            return b'\1' + struct.pack('<%di' % len(steps), *steps)
+    return b'\0' + struct.pack('<%dd' % len(values), *values)
+
+def _unpackValues(data, offset, count, step):
+    quantized = data[offset:offset + 1] == b'\1'
+    offset += 1
+    if quantized:
+        values = [s * step for s in struct.unpack_from('<%di' % count, data, offset)]
+        return (values, offset + 4 * count)
+    return (list(struct.unpack_from('<%dd' % count, data, offset)), offset + 8 * count)
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,965 @@
+"""
+Pose file formats for the pose manager (P_maya_c7_poseMgr.py).
+
+A binary pose file is a versioned container with a string table of node and
+attribute names and one contiguous block of float64 values:
+
+    header        '<4sHHIII': magic 'ARPS', version, flags, numNodes, numAttrs, numChannels
+    string table  '<I' byte length, then the node names and the attribute names,
+                  utf-8, each terminated by a null byte
+    channels      numChannels pairs of '<I' (node index, attribute index)
+    padding       zero bytes up to the next multiple of 8
+    values        numChannels '<d' values, in channel order
+
+The value block is read straight out of a memory map. Bit 0 of flags
+(kSparseFlag) marks a sparse pose, captured without the attributes that were
+at their default value, which are reset to it when the pose is applied.
+
+A streamed pose file (version 2) is written and read one node record at a
+time, so neither side ever holds the whole pose:
+
+    header        as above with version 2; the counts are filled in on close
+                  when the file can seek, and are zero otherwise
+    records       '<II' node name length, channel count, the node name, then per
+                  channel '<Id' attribute index, value. An index one past the
+                  attributes seen so far introduces a new attribute: its '<I'
+                  name length and name follow the value.
+
+Legacy pose files are pickled dicts of node -> [[attr, value], ...] and remain
+readable. Pickles written by this module mark a sparse pose with a kSparseNode
+entry without attributes, which older readers apply as nothing. In memory a pose is a PoseData, which reads
+like that dict but keeps name tables and one flat value buffer. Channels read
+back come as PoseChannels, which carry the sparse flag of their pose.
+
+Nothing in this module imports Maya.
+"""
+import os, sys, struct, mmap, time, tempfile, io
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+from array import array
+from collections import OrderedDict
+
+import P_maya_utils as utils
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+kMagic = b'ARPS'
+kVersion = 1
+kStreamVersion = 2
+kHeader = struct.Struct('<4sHHIII')
+kLengthField = struct.Struct('<I')
+kRecordHeader = struct.Struct('<II')
+kChannel = struct.Struct('<Id')
+# header flags
+kSparseFlag = 1
+# node of a pickled pose marking it as sparse, never a valid Maya node name
+kSparseNode = '<sparse>'
+
+def isBinaryPose(filePath):
+    """
+    Return whether filePath holds a binary pose, as opposed to a legacy pickle
+    """
+    f = open(filePath, 'rb')
+    try:
+        return f.read(len(kMagic)) == kMagic
+    finally:
+        f.close()
+
+def poseVersion(filePath):
+    """
+    Return the format version of the binary pose at filePath, or None for a
+    legacy pickle
+    """
+    return _poseHeader(filePath)[0]
+
+def _poseHeader(filePath):
+    """
+    Return (version, flags) of the binary pose at filePath, (None, 0) for a
+    legacy pickle
+    """
+    f = open(filePath, 'rb')
+    try:
+        header = f.read(kHeader.size)
+    finally:
+        f.close()
+    if len(header) < kHeader.size or header[:len(kMagic)] != kMagic:
+        return (None, 0)
+    return kHeader.unpack(header)[1:3]
+
+class PoseChannels(object):
+    """
+    The (node, attr, value) channels of a pose, iterated once, with the
+    sparse flag of the pose they come from
+    """
+    def __init__(self, channels, sparse=False):
+        self.iterator = iter(channels)
+        self.sparse = sparse
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        return next(self.iterator)
+
+    __next__ = next
+
+def writeBinaryPose(f, data, sparse=None):
+    """
+    Write the pose in data, a dict of node -> [[attr, value], ...], to the
+    file object f, opened in binary mode. Raise ValueError if a value is
+    not a plain number. sparse defaults to the sparse flag of a PoseData.
+    """
+    if sparse is None:
+        sparse = getattr(data, 'sparse', False)
+    nodes = []
+    attrs = []
+    attrIndex = {}
+    channels = array('I')
+    values = array('d')
+    for node in data:
+        nodeId = len(nodes)
+        nodes.append(node)
+        for item in data[node]:
+            attr = item[0]
+            if attr not in attrIndex:
+                attrIndex[attr] = len(attrs)
+                attrs.append(attr)
+            try:
+                values.append(float(item[-1]))
+            except (TypeError, ValueError):
+                raise ValueError('%s.%s is not a number: %r' % (node, attr, item[-1]))
+            channels.append(nodeId)
+            channels.append(attrIndex[attr])
+    names = b''.join([_encode(name) + b'\0' for name in nodes + attrs])
+    f.write(kHeader.pack(kMagic, kVersion, kSparseFlag if sparse else 0, len(nodes), len(attrs), len(values)))
+    f.write(kLengthField.pack(len(names)))
+    f.write(names)
+    _writeArray(f, _littleEndian(channels))
+    f.write(b'\0' * _padding(kHeader.size + kLengthField.size + len(names) + 8 * len(values)))
+    _writeArray(f, _littleEndian(values))
+
+class BinaryPose(object):
+    """
+    A binary pose file opened through a memory map, or a binary pose already in
+    memory when data holds its bytes.
+    The name tables are decoded on open; the values stay in the map until read.
+    """
+    def __init__(self, filePath=None, data=None):
+        if data is not None:
+            self.map = data
+            filePath = '<memory>'
+        else:
+            f = open(filePath, 'rb')
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            finally:
+                f.close()
+        magic, version, flags, numNodes, numAttrs, numChannels = kHeader.unpack_from(self.map, 0)
+        if magic != kMagic:
+            raise ValueError('%s is not a binary pose file' % filePath)
+        if version != kVersion:
+            raise ValueError('%s has pose format version %d, expected %d' % (filePath, version, kVersion))
+        self.sparse = bool(flags & kSparseFlag)
+        offset = kHeader.size
+        namesLength = kLengthField.unpack_from(self.map, offset)[0]
+        offset += kLengthField.size
+        names = [_decode(name) for name in self.map[offset:offset + namesLength].split(b'\0')[:-1]]
+        offset += namesLength
+        self.nodes = names[:numNodes]
+        self.attrs = names[numNodes:numNodes + numAttrs]
+        self.channelIds = _readArray('I', self.map[offset:offset + 8 * numChannels])
+        offset += 8 * numChannels
+        self.numChannels = numChannels
+        self.valueOffset = offset + _padding(offset)
+
+    def values(self):
+        """
+        Return the value block: a read-only numpy view of the map if numpy is
+        available, else an array('d') copy
+        """
+        if numpy is not None:
+            return numpy.frombuffer(self.map, dtype='<f8', count=self.numChannels, offset=self.valueOffset)
+        return _readArray('d', self.map[self.valueOffset:self.valueOffset + 8 * self.numChannels])
+
+    def channels(self):
+        """
+        Generate (node, attr, value) for every stored channel
+        """
+        ids = self.channelIds
+        values = self.values()
+        for i in range(self.numChannels):
+            yield (self.nodes[ids[2 * i]], self.attrs[ids[2 * i + 1]], float(values[i]))
+
+    def toDict(self):
+        """
+        Return the pose in the legacy shape, a dict of node -> [[attr, value], ...]
+        """
+        data = {}
+        for node, attr, value in self.channels():
+            data.setdefault(node, []).append([attr, value])
+        return data
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+
+class PoseStreamWriter(object):
+    """
+    Write a streamed pose (version 2) to the binary file object f, one node
+    record at a time. Only the attribute name table is kept in memory.
+    sparse marks a pose captured without its attributes at their default.
+    """
+    def __init__(self, f, sparse=False):
+        self.f = f
+        self.flags = kSparseFlag if sparse else 0
+        self.attrIndex = {}
+        self.numNodes = 0
+        self.numChannels = 0
+        # values that are not plain numbers are left out of the stream
+        self.numSkipped = 0
+        f.write(kHeader.pack(kMagic, kStreamVersion, self.flags, 0, 0, 0))
+
+    def write(self, node, values):
+        """
+        Write the record of node, values being [[attr, value], ...]
+        """
+        channels = []
+        for item in values:
+            attr = item[0]
+            try:
+                value = float(item[-1])
+            except (TypeError, ValueError):
+                self.numSkipped += 1
+                continue
+            index = self.attrIndex.get(attr)
+            if index is None:
+                # first use of the attribute, its name follows the value
+                index = self.attrIndex[attr] = len(self.attrIndex)
+                name = _encode(attr)
+                channels.append(kChannel.pack(index, value) + kLengthField.pack(len(name)) + name)
+            else:
+                channels.append(kChannel.pack(index, value))
+        name = _encode(node)
+        self.f.write(kRecordHeader.pack(len(name), len(channels)) + name + b''.join(channels))
+        self.numNodes += 1
+        self.numChannels += len(channels)
+
+    def close(self):
+        """
+        Fill in the counts of the header if the file can seek
+        """
+        try:
+            end = self.f.tell()
+            self.f.seek(0)
+        except (IOError, OSError):
+            return
+        self.f.write(kHeader.pack(kMagic, kStreamVersion, self.flags, self.numNodes, len(self.attrIndex),
+                                  self.numChannels))
+        self.f.seek(end)
+
+def iterPoseRecords(f):
+    """
+    Generate (node, [[attr, value], ...]) for every record of the streamed pose
+    in the binary file object f, reading one record at a time
+    """
+    header = f.read(kHeader.size)
+    if len(header) < kHeader.size or kHeader.unpack(header)[:2] != (kMagic, kStreamVersion):
+        raise ValueError('Not a streamed pose file')
+    attrs = []
+    while True:
+        recordHeader = f.read(kRecordHeader.size)
+        if len(recordHeader) < kRecordHeader.size:
+            return
+        nameLength, count = kRecordHeader.unpack(recordHeader)
+        node = _decode(f.read(nameLength))
+        values = []
+        for i in range(count):
+            index, value = kChannel.unpack(f.read(kChannel.size))
+            if index == len(attrs):
+                length = kLengthField.unpack(f.read(kLengthField.size))[0]
+                attrs.append(_decode(f.read(length)))
+            values.append([attrs[index], value])
+        yield (node, values)
+
+def writePose(filePath, data, binary=True):
+    """
+    Write the pose in data to filePath, as a binary pose or a legacy pickle.
+    A pose holding values that are not plain numbers is written as a pickle.
+    Return whether the binary format was used.
+    """
+    if binary:
+        f = open(filePath, 'wb')
+        try:
+            writeBinaryPose(f, data)
+            return True
+        except ValueError:
+            pass
+        finally:
+            f.close()
+    # pickles are bytes on python 3, and text mode would mangle them on windows
+    f = open(filePath, 'wb')
+    try:
+        pickle.dump(legacyShape(data), f)
+    finally:
+        f.close()
+    return False
+
+class AtomicFile(object):
+    """
+    A file written under a temporary name in the folder of filePath and renamed
+    to filePath on commit(), so filePath only ever holds a complete file
+    """
+    def __init__(self, filePath, mode='wb'):
+        self.filePath = filePath
+        folder = os.path.dirname(os.path.abspath(filePath))
+        fd, self.tempPath = utils.makeTempFile(folder, prefix='.%s.' % os.path.basename(filePath), suffix='.tmp')
+        self.f = os.fdopen(fd, mode)
+
+    def commit(self):
+        """
+        Flush the file to disk and rename it to filePath, with the permissions
+        of the file it replaces, or those of a file made with open()
+        """
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.f.close()
+        # the temporary file was made with the permissions of a new file
+        if os.path.exists(self.filePath):
+            os.chmod(self.tempPath, os.stat(self.filePath).st_mode & 0o7777)
+        try:
+            os.rename(self.tempPath, self.filePath)
+        except OSError:
+            # windows does not rename over an existing file
+            if not os.path.exists(self.filePath):
+                raise
+            os.remove(self.filePath)
+            os.rename(self.tempPath, self.filePath)
+
+    def discard(self):
+        """
+        Close and delete the temporary file, leaving filePath as it was
+        """
+        self.f.close()
+        if os.path.exists(self.tempPath):
+            os.remove(self.tempPath)
+
+def writePoseAtomic(filePath, data, binary=True):
+    """
+    writePose() through an AtomicFile: a failure leaves no partial file at filePath.
+    Return whether the binary format was used.
+    """
+    if binary:
+        atomic = AtomicFile(filePath, 'wb')
+        try:
+            writeBinaryPose(atomic.f, data)
+        except ValueError:
+            atomic.discard()
+        except:
+            atomic.discard()
+            raise
+        else:
+            atomic.commit()
+            return True
+    atomic = AtomicFile(filePath, 'wb')
+    try:
+        pickle.dump(legacyShape(data), atomic.f)
+    except:
+        atomic.discard()
+        raise
+    atomic.commit()
+    return False
+
+def writePoses(jobs, binary=True, workers=None, stream=sys.stdout):
+    """
+    Write (filePath, data) jobs with writePoseAtomic() in a pool of worker
+    threads, workers defaulting to the number of CPUs. The threads spend their
+    time in file I/O, which releases the GIL.
+    Return a list of (filePath, error) for the jobs that failed.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = max(1, min(workers, len(jobs)))
+
+    def write(job):
+        try:
+            writePoseAtomic(job[0], job[1], binary)
+        except (IOError, OSError) as e:
+            return (job[0], e)
+        return None
+
+    start = time.time()
+    pool = ThreadPool(workers)
+    try:
+        errors = [error for error in pool.map(write, jobs) if error is not None]
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.time() - start
+    stream.write('Wrote %d poses in %.3fs (%.1f poses/s), %d failed\n' %
+                 (len(jobs) - len(errors), elapsed, len(jobs) / max(elapsed, 1e-6), len(errors)))
+    return errors
+
+def readPose(filePath):
+    """
+    Read the pose at filePath in either format.
+    Return a dict of node -> [[attr, value], ...]
+    """
+    version = poseVersion(filePath)
+    if version is None:
+        return readLegacyPose(filePath)
+    if version == kVersion:
+        pose = BinaryPose(filePath)
+        try:
+            return pose.toDict()
+        finally:
+            pose.close()
+    data = {}
+    for node, attr, value in iterPose(filePath):
+        data.setdefault(node, []).append([attr, value])
+    return data
+
+def iterPose(filePath):
+    """
+    Return the (node, attr, value) channels of the pose at filePath, in any
+    format, as PoseChannels. Binary poses are read from the memory map and
+    streamed poses record by record as they go.
+    """
+    version, flags = _poseHeader(filePath)
+    if version is None:
+        data, sparse = _loadLegacyPose(filePath)
+        return PoseChannels(_iterChannels(data), sparse)
+    return PoseChannels(_iterPose(filePath, version), bool(flags & kSparseFlag))
+
+def _iterPose(filePath, version):
+    if version == kVersion:
+        pose = BinaryPose(filePath)
+        try:
+            for channel in pose.channels():
+                yield channel
+        finally:
+            pose.close()
+    elif version == kStreamVersion:
+        f = open(filePath, 'rb')
+        try:
+            for channel in _iterStreamChannels(f):
+                yield channel
+        finally:
+            f.close()
+    else:
+        raise ValueError('%s has unknown pose format version %d' % (filePath, version))
+
+class PoseData(object):
+    """
+    A pose held as node and attribute name tables and one flat buffer of
+    float64 values, instead of a dict of node -> [[attr, value], ...].
+    It still reads like that dict: iterating gives the node names and
+    pose[node] builds the node's list when asked for.
+
+    The channels of a node are contiguous in the buffer. Nodes with the same
+    attributes in the same order share one layout, the attr -> offset table
+    that makes value(node, attr) O(1).
+    """
+    def __init__(self, sparse=False):
+        # captured without the attributes at their default value
+        self.sparse = sparse
+        self.nodes = []
+        self.attrs = []
+        self.nodeIndex = {}
+        self.attrIndex = {}
+        # per node: first channel in the buffer and layout id
+        self.nodeStart = array('I')
+        self.nodeLayout = array('I')
+        # per layout: attribute ids, and attribute id -> offset from the node start
+        self.layouts = []
+        self.layoutOffsets = []
+        self.layoutIndex = {}
+        self.buffer = array('d')
+        # channel -> value, for the rare values that are not plain numbers
+        self.objects = {}
+
+    @classmethod
+    def fromDict(cls, data):
+        """
+        Return the PoseData of a pose dict, or of any (node, [[attr, value], ...]) pairs
+        """
+        pose = cls()
+        items = data.items() if hasattr(data, 'items') else data
+        for node, values in items:
+            pose.addNode(node, values)
+        return pose
+
+    def addNode(self, node, values):
+        """
+        Append node and its [[attr, value], ...] values. Return False, adding
+        nothing, if node is already in the pose.
+        """
+        if node in self.nodeIndex:
+            return False
+        attrIds = []
+        for item in values:
+            attr = item[0]
+            attrId = self.attrIndex.get(attr)
+            if attrId is None:
+                attrId = self.attrIndex[attr] = len(self.attrs)
+                self.attrs.append(attr)
+            attrIds.append(attrId)
+        attrIds = tuple(attrIds)
+        layout = self.layoutIndex.get(attrIds)
+        if layout is None:
+            layout = self.layoutIndex[attrIds] = len(self.layouts)
+            self.layouts.append(attrIds)
+            self.layoutOffsets.append(dict([(attrId, i) for i, attrId in enumerate(attrIds)]))
+        self.nodeIndex[node] = len(self.nodes)
+        self.nodes.append(node)
+        start = len(self.buffer)
+        self.nodeStart.append(start)
+        self.nodeLayout.append(layout)
+        for i, item in enumerate(values):
+            try:
+                self.buffer.append(float(item[-1]))
+            except (TypeError, ValueError):
+                self.buffer.append(float('nan'))
+                self.objects[start + i] = item[-1]
+        return True
+
+    def value(self, node, attr, default=None):
+        """
+        Return the value of node.attr, or default if the pose does not hold it
+        """
+        nodeId = self.nodeIndex.get(node)
+        attrId = self.attrIndex.get(attr)
+        if nodeId is None or attrId is None:
+            return default
+        offset = self.layoutOffsets[self.nodeLayout[nodeId]].get(attrId)
+        if offset is None:
+            return default
+        channel = self.nodeStart[nodeId] + offset
+        if channel in self.objects:
+            return self.objects[channel]
+        return self.buffer[channel]
+
+    def numChannels(self):
+        return len(self.buffer)
+
+    def array(self):
+        """
+        Return the value buffer, as a numpy view when numpy is available.
+        Channels holding other values are nan there.
+        """
+        if numpy is not None:
+            return numpy.frombuffer(self.buffer, dtype=numpy.float64)
+        return self.buffer
+
+    def channels(self):
+        """
+        Generate (node, attr, value) for every channel, in the order they were added
+        """
+        for node in self.nodes:
+            for item in self[node]:
+                yield (node, item[0], item[1])
+
+    def __getitem__(self, node):
+        """
+        Return the [[attr, value], ...] list of node, built on each call
+        """
+        nodeId = self.nodeIndex[node]
+        start = self.nodeStart[nodeId]
+        attrs = self.attrs
+        objects = self.objects
+        values = []
+        for i, attrId in enumerate(self.layouts[self.nodeLayout[nodeId]]):
+            value = objects[start + i] if start + i in objects else self.buffer[start + i]
+            values.append([attrs[attrId], value])
+        return values
+
+    def __contains__(self, node):
+        return node in self.nodeIndex
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def keys(self):
+        return list(self.nodes)
+
+    def values(self):
+        return [self[node] for node in self.nodes]
+
+    def items(self):
+        return [(node, self[node]) for node in self.nodes]
+
+    def toDict(self):
+        """
+        Return the pose in the legacy shape, a dict of node -> [[attr, value], ...]
+        """
+        return dict(self.items())
+
+def iterChannels(data):
+    """
+    Return the (node, attr, value) channels of a pose dict or PoseData as
+    PoseChannels
+    """
+    return PoseChannels(_iterChannels(data), getattr(data, 'sparse', False))
+
+def _iterChannels(data):
+    if isinstance(data, PoseData):
+        for channel in data.channels():
+            yield channel
+        return
+    for node in data:
+        for item in data[node]:
+            yield (node, item[0], item[-1])
+
+def packPose(data):
+    """
+    Return the pose dict data as the bytes of a binary pose file, or of a
+    legacy pickle if it holds values that are not plain numbers
+    """
+    buf = io.BytesIO()
+    try:
+        writeBinaryPose(buf, data)
+    except ValueError:
+        # the sparse flag goes with the pickle as its kSparseNode entry
+        return pickle.dumps(legacyShape(data), 0)
+    return buf.getvalue()
+
+def iterPackedPose(blob):
+    """
+    Return the (node, attr, value) channels of a pose packed by packPose(),
+    or of a streamed pose held in memory, as PoseChannels
+    """
+    if blob[:len(kMagic)] == kMagic:
+        version, flags = kHeader.unpack_from(blob, 0)[1:3]
+        sparse = bool(flags & kSparseFlag)
+        if version == kStreamVersion:
+            return PoseChannels(_iterStreamChannels(io.BytesIO(blob)), sparse)
+        return PoseChannels(BinaryPose(data=blob).channels(), sparse)
+    data, sparse = _splitSparse(pickle.loads(blob))
+    return PoseChannels(_iterChannels(data), sparse)
+
+class PoseLRU(object):
+    """
+    Packed poses kept in memory by key, least recently used first. The oldest
+    entries are evicted once there are more than maxEntries of them or they
+    take more than maxBytes.
+    """
+    def __init__(self, maxEntries=10, maxBytes=64 * 1024 * 1024):
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.numBytes = 0
+
+    def put(self, key, blob):
+        """
+        Store the packed pose blob under key as the most recent entry
+        """
+        self.discard(key)
+        self.entries[key] = blob
+        self.numBytes += len(blob)
+        # always keep the newest entry, even if it is over the budget on its own
+        while len(self.entries) > 1 and (len(self.entries) > self.maxEntries or self.numBytes > self.maxBytes):
+            oldest = next(iter(self.entries))
+            self.discard(oldest)
+
+    def get(self, key):
+        """
+        Return the packed pose under key and mark it most recently used, or None
+        """
+        blob = self.entries.pop(key, None)
+        if blob is not None:
+            self.entries[key] = blob
+        return blob
+
+    def discard(self, key):
+        blob = self.entries.pop(key, None)
+        if blob is not None:
+            self.numBytes -= len(blob)
+
+    def keys(self):
+        """
+        Return the keys, most recently used first
+        """
+        return list(reversed(list(self.entries.keys())))
+
+    def __len__(self):
+        return len(self.entries)
+
+class PoseClipboard(PoseLRU):
+    """
+    In-process pose clipboard holding the last copied poses. Disk is only used
+    to carry the most recent pose over to the next session.
+    """
+    def copy(self, label, data):
+        """
+        Put the pose dict data on the clipboard under label
+        """
+        self.put(label, packPose(data))
+
+    def paste(self, label=None):
+        """
+        Return (node, attr, value) channels of the pose under label, by default
+        the most recent one, or None if the clipboard is empty
+        """
+        if label is None:
+            if not self.entries:
+                return None
+            label = self.keys()[0]
+        blob = self.get(label)
+        if blob is None:
+            return None
+        return iterPackedPose(blob)
+
+    def save(self, filePath):
+        """
+        Write the most recent pose to filePath, if there is one
+        """
+        if not self.entries:
+            return
+        f = open(filePath, 'wb')
+        try:
+            f.write(self.entries[self.keys()[0]])
+        finally:
+            f.close()
+
+class PoseFileCache(PoseLRU):
+    """
+    Poses read from files, by path, packed as streamed poses. An entry is
+    reused as long as the modification time and size of its file have not
+    changed.
+    """
+    def __init__(self, maxEntries=10, maxBytes=16 * 1024 * 1024):
+        PoseLRU.__init__(self, maxEntries, maxBytes)
+
+    def load(self, filePath):
+        """
+        Return (node, attr, value) channels of the pose at filePath. A file
+        loaded before and unchanged since comes from the cache. Any other is
+        read with iterPose() as the channels are used, and what was read is
+        cached once the last channel has gone by. Files larger than the
+        budget are only streamed.
+        """
+        stat = os.stat(filePath)
+        key = (os.path.abspath(filePath), stat.st_mtime, stat.st_size)
+        blob = self.get(key)
+        if blob is not None:
+            return iterPackedPose(blob)
+        # drop older versions of the same file
+        for other in self.keys():
+            if other[0] == key[0]:
+                self.discard(other)
+        channels = iterPose(filePath)
+        if stat.st_size > self.maxBytes:
+            return channels
+        return PoseChannels(self._iterCaching(channels, key), channels.sparse)
+
+    def _iterCaching(self, channels, key):
+        """
+        Generate channels, PoseChannels, packing them node by node as they go
+        by. The pose is cached under key only if it was read to the end, every
+        value was a number and the packed pose fits the budget.
+        """
+        buf = io.BytesIO()
+        writer = PoseStreamWriter(buf, channels.sparse)
+        node = None
+        values = []
+        for channel in channels:
+            if writer is not None and channel[0] != node:
+                if node is not None:
+                    writer.write(node, values)
+                node = channel[0]
+                values = []
+                if buf.tell() > self.maxBytes:
+                    # stop packing, the rest is still streamed
+                    writer = buf = None
+            if writer is not None:
+                values.append([channel[1], channel[2]])
+            yield channel
+        if writer is None:
+            return
+        if node is not None:
+            writer.write(node, values)
+        writer.close()
+        if not writer.numSkipped and buf.tell() <= self.maxBytes:
+            self.put(key, buf.getvalue())
+
+if isinstance(pickle.Unpickler, type):
+    class _PoseUnpickler(pickle.Unpickler):
+        """
+        Unpickler that refuses to load any class or function
+        """
+        def find_class(self, module, name):
+            raise pickle.UnpicklingError('%s.%s is not allowed in a pose file' % (module, name))
+else:
+    # cPickle's Unpickler is a factory, restricted through find_global instead
+    _PoseUnpickler = None
+
+def readLegacyPose(filePath):
+    """
+    Unpickle a legacy pose file. Poses are made of plain lists, strings and
+    numbers, so loading any class or function is refused.
+    """
+    return _loadLegacyPose(filePath)[0]
+
+def _loadLegacyPose(filePath):
+    """
+    Return (data, sparse) of the legacy pose file at filePath
+    """
+    f = open(filePath, 'rb')
+    try:
+        data = f.read()
+    finally:
+        f.close()
+    # older files were written in text mode, with windows line endings
+    # in the text protocol 0; the binary protocols start with '\x80'
+    if not data.startswith(b'\x80'):
+        data = data.replace(b'\r\n', b'\n')
+    if _PoseUnpickler is not None:
+        return _splitSparse(_PoseUnpickler(io.BytesIO(data)).load())
+    unpickler = pickle.Unpickler(io.BytesIO(data))
+    # cPickle: no global may be loaded at all
+    unpickler.find_global = None
+    return _splitSparse(unpickler.load())
+
+def benchmark(numNodes=10000, attrsPerNode=10, stream=sys.stdout):
+    """
+    Compare file size and load time of a legacy pickle and a binary pose of
+    numNodes nodes with attrsPerNode attributes each.
+    Return a dict of the measurements.
+    """
+    attrs = ['attr%d' % i for i in range(attrsPerNode)]
+    data = {}
+    for n in range(numNodes):
+        data['ctrl_%05d' % n] = [[attr, n * 0.001 + i] for i, attr in enumerate(attrs)]
+    folder = tempfile.mkdtemp()
+    legacyPath = os.path.join(folder, 'legacy.pse')
+    binaryPath = os.path.join(folder, 'binary.pse')
+    writePose(legacyPath, data, binary=False)
+    writePose(binaryPath, data)
+    result = {'legacyBytes': os.path.getsize(legacyPath), 'binaryBytes': os.path.getsize(binaryPath)}
+    start = time.time()
+    readLegacyPose(legacyPath)
+    result['legacyLoad'] = time.time() - start
+    start = time.time()
+    pose = BinaryPose(binaryPath)
+    pose.values()
+    result['binaryOpen'] = time.time() - start
+    pose.close()
+    start = time.time()
+    readPose(binaryPath)
+    result['binaryLoad'] = time.time() - start
+    for path in (legacyPath, binaryPath):
+        os.remove(path)
+    os.rmdir(folder)
+    stream.write('%d channels\n' % (numNodes * attrsPerNode))
+    stream.write('  legacy pickle: %d bytes, load %.4fs\n' % (result['legacyBytes'], result['legacyLoad']))
+    stream.write('  binary pose:   %d bytes, mmap open %.4fs, load as dict %.4fs\n' %
+                 (result['binaryBytes'], result['binaryOpen'], result['binaryLoad']))
+    return result
+
+def measurePoseMemory(numNodes=2000, attrsPerNode=10, stream=sys.stdout):
+    """
+    Compare the memory taken per channel by a pose dict of numNodes nodes with
+    attrsPerNode attributes each and by the same pose as a PoseData.
+    Return a dict of the measurements in bytes.
+    """
+    attrs = ['attr%d' % i for i in range(attrsPerNode)]
+    data = {}
+    for n in range(numNodes):
+        data['ctrl_%05d' % n] = [[attr, n * 0.001 + i] for i, attr in enumerate(attrs)]
+    pose = PoseData.fromDict(data)
+    numChannels = numNodes * attrsPerNode
+    # the names are the same strings in both, count them in neither
+    shared = set([id(name) for name in list(data.keys()) + attrs])
+    result = {'dictBytes': utils.deepSize(data, set(shared)),
+              'poseDataBytes': utils.deepSize(pose, set(shared))}
+    result['dictPerChannel'] = result['dictBytes'] / float(numChannels)
+    result['poseDataPerChannel'] = result['poseDataBytes'] / float(numChannels)
+    stream.write('%d channels\n' % numChannels)
+    stream.write('  pose dict: %d bytes, %.1f per channel\n' % (result['dictBytes'], result['dictPerChannel']))
+    stream.write('  PoseData:  %d bytes, %.1f per channel\n' % (result['poseDataBytes'], result['poseDataPerChannel']))
+    return result
+
+def _iterStreamChannels(f):
+    """
+    Generate (node, attr, value) for every channel of the streamed pose in the
+    binary file object f
+    """
+    for node, values in iterPoseRecords(f):
+        for item in values:
+            yield (node, item[0], item[1])
+
+def legacyShape(data):
+    """
+    Return data as a plain dict, the only shape legacy pose files may hold,
+    with a kSparseNode entry if data is a sparse pose
+    """
+    if isinstance(data, PoseData):
+        shape = data.toDict()
+    else:
+        shape = data
+    if getattr(data, 'sparse', False):
+        shape = dict(shape)
+        shape[kSparseNode] = []
+    return shape
+
+def _splitSparse(data):
+    """
+    Return (data, sparse) of an unpickled pose, without its kSparseNode entry
+    """
+    if not isinstance(data, dict) or kSparseNode not in data:
+        return (data, False)
+    data = dict(data)
+    del data[kSparseNode]
+    return (data, True)
+
+def _encode(name):
+    if isinstance(name, bytes):
+        return name
+    return name.encode('utf-8')
+
+def _decode(name):
+    name = name.decode('utf-8')
+    try:
+        # keep plain str names under python 2, like cmds returns for ascii
+        return str(name)
+    except UnicodeError:
+        return name
+
+def _padding(offset):
+    return (8 - offset % 8) % 8
+
+def _littleEndian(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+def _writeArray(f, values):
+    if hasattr(values, 'tobytes'):
+        f.write(values.tobytes())
+    else:
+        f.write(values.tostring())
+
+def _readArray(typecode, data):
+    values = array(typecode)
+    if hasattr(values, 'frombytes'):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+    return _littleEndian(values)
+
+if __name__ == '__main__':
+    benchmark()
+    measurePoseMemory()
@@ -0,0 +1,328 @@
+"""
+Pose library for the pose manager (P_maya_c7_poseMgr.py).
+
+Poses are stored as binary pose files in the library folder. An SQLite index
+next to them holds the name, rig, node set, tags, timestamps and a small
+preview of every pose, so a library can be browsed and searched without
+opening a single pose file. The payload is only read when a pose is applied.
+
+Every pose of a known rig also gets a feature vector: its values in the order
+of the rig's channel layout, which only ever grows, with the default value of
+every channel the pose left out. nearest() searches those vectors with a
+kd-tree to find the stored poses closest to a captured one.
+
+Nothing in this module imports Maya.
+"""
+import os, time, uuid, sqlite3, struct
+import P_maya_c7_poseFile as poseFile
+import P_maya_c7_poseSearch as poseSearch
+
+kIndexFile = 'library.db'
+kPoseFolder = 'poses'
+
+kSchema = """
+CREATE TABLE IF NOT EXISTS poses (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    rig TEXT,
+    file TEXT NOT NULL UNIQUE,
+    numNodes INTEGER,
+    numChannels INTEGER,
+    created REAL,
+    modified REAL,
+    preview BLOB
+);
+CREATE TABLE IF NOT EXISTS poseNodes (
+    pose INTEGER NOT NULL REFERENCES poses(id) ON DELETE CASCADE,
+    node TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS poseTags (
+    pose INTEGER NOT NULL REFERENCES poses(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    UNIQUE (pose, tag)
+);
+CREATE TABLE IF NOT EXISTS rigChannels (
+    rig TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    node TEXT NOT NULL,
+    attr TEXT NOT NULL,
+    defaultValue REAL NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (rig, position)
+);
+CREATE TABLE IF NOT EXISTS rigGenerations (
+    rig TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS poseFeatures (
+    pose INTEGER PRIMARY KEY REFERENCES poses(id) ON DELETE CASCADE,
+    rig TEXT NOT NULL,
+    vector BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posesByName ON poses(name);
+CREATE INDEX IF NOT EXISTS posesByRig ON poses(rig);
+CREATE INDEX IF NOT EXISTS poseNodesByNode ON poseNodes(node);
+CREATE INDEX IF NOT EXISTS poseNodesByPose ON poseNodes(pose);
+CREATE INDEX IF NOT EXISTS poseTagsByTag ON poseTags(tag);
+CREATE INDEX IF NOT EXISTS poseFeaturesByRig ON poseFeatures(rig);
+"""
+
+# columns returned by queries; the preview and the payload are fetched separately
+kColumns = ('id', 'name', 'rig', 'file', 'numNodes', 'numChannels', 'created', 'modified')
+
+class PoseLibrary(object):
+    """
+    A folder of pose files with an SQLite index
+    """
+    def __init__(self, root):
+        """
+        Open the library in the folder root, creating it if needed
+        """
+        self.root = root
+        poseDir = os.path.join(root, kPoseFolder)
+        if not os.path.isdir(poseDir):
+            os.makedirs(poseDir)
+        self.db = sqlite3.connect(os.path.join(root, kIndexFile))
+        self.db.execute('PRAGMA foreign_keys = ON')
+        self.db.executescript(kSchema)
+        # libraries made before channels had defaults
+        columns = [row[1] for row in self.db.execute('PRAGMA table_info(rigChannels)')]
+        if 'defaultValue' not in columns:
+            self.db.execute('ALTER TABLE rigChannels ADD COLUMN defaultValue REAL NOT NULL DEFAULT 0.0')
+        self.db.commit()
+        # per rig: (generation, pose ids, channel layout, defaults, kd-tree) of the last search
+        self.searchIndex = {}
+
+    def add(self, name, data, rig=None, tags=(), preview=None, defaults=None):
+        """
+        Add the pose dict data to the library and return its id.
+        preview is optional image data, a few kilobytes at most. defaults is
+        a dict of (node, attr) -> default value for the channels of rig, used
+        in place of the channels a pose leaves out.
+        """
+        fileName = '%s.%s' % (uuid.uuid4().hex, 'pse')
+        poseFile.writePose(os.path.join(self.root, kPoseFolder, fileName), data)
+        now = time.time()
+        numChannels = sum([len(values) for values in data.values()])
+        cursor = self.db.execute(
+            'INSERT INTO poses (name, rig, file, numNodes, numChannels, created, modified, preview) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (name, rig, fileName, len(data), numChannels, now, now,
+             None if preview is None else sqlite3.Binary(preview)))
+        poseId = cursor.lastrowid
+        self.db.executemany('INSERT INTO poseNodes (pose, node) VALUES (?, ?)',
+                            [(poseId, node) for node in data])
+        self.db.executemany('INSERT OR IGNORE INTO poseTags (pose, tag) VALUES (?, ?)',
+                            [(poseId, tag) for tag in tags])
+        if rig is not None:
+            self.storeFeatures(poseId, rig, data, defaults)
+        self.db.commit()
+        return poseId
+    
+    def channelLayout(self, rig):
+        """
+        Return the (node, attr) channels of rig in feature vector order
+        """
+        return [(row[0], row[1]) for row in self.db.execute(
+            'SELECT node, attr FROM rigChannels WHERE rig = ? ORDER BY position', (rig,))]
+    
+    def layoutDefaults(self, rig):
+        """
+        Return the default values of the channels of rig in feature vector order
+        """
+        return [row[0] for row in self.db.execute(
+            'SELECT defaultValue FROM rigChannels WHERE rig = ? ORDER BY position', (rig,))]
+    
+    def generation(self, rig):
+        """
+        Return the number of times poses of rig were stored or removed
+        """
+        row = self.db.execute('SELECT generation FROM rigGenerations WHERE rig = ?', (rig,)).fetchone()
+        if row is None:
+            return 0
+        return row[0]
+    
+    def bumpGeneration(self, rig):
+        """
+        Mark the poses of rig as changed, so the next search rebuilds its kd-tree
+        """
+        self.db.execute('INSERT OR IGNORE INTO rigGenerations (rig, generation) VALUES (?, 0)', (rig,))
+        self.db.execute('UPDATE rigGenerations SET generation = generation + 1 WHERE rig = ?', (rig,))
+    
+    def storeFeatures(self, poseId, rig, data, defaults=None):
+        """
+        Store the feature vector of a pose, appending channels the rig's layout
+        does not have yet with their value in defaults, a dict of
+        (node, attr) -> default value, or 0.0
+        """
+        layout = self.channelLayout(rig)
+        layoutDefaults = self.layoutDefaults(rig)
+        positions = dict([(channel, i) for i, channel in enumerate(layout)])
+        newChannels = []
+        for node, attr, value in poseFile.iterChannels(data):
+            if (node, attr) not in positions:
+                positions[(node, attr)] = len(positions)
+                default = 0.0
+                if defaults is not None:
+                    default = float(defaults.get((node, attr), 0.0))
+                layoutDefaults.append(default)
+                newChannels.append((rig, positions[(node, attr)], node, attr, default))
+        self.db.executemany('INSERT INTO rigChannels (rig, position, node, attr, defaultValue) '
+                            'VALUES (?, ?, ?, ?, ?)', newChannels)
+        vector = featureVector(data, positions, layoutDefaults)
+        self.db.execute('INSERT OR REPLACE INTO poseFeatures (pose, rig, vector) VALUES (?, ?, ?)',
+                        (poseId, rig, sqlite3.Binary(packVector(vector))))
+        self.bumpGeneration(rig)
+    
+    def nearest(self, rig, data, k=5):
+        """
+        Return up to k (distance, row) pairs for the poses of rig nearest to the
+        pose dict data, nearest first. Channels the rig's layout does not know
+        are ignored, channels the pose leaves out take their default. The
+        kd-tree is rebuilt only when poses of the rig were added or removed
+        since the last search.
+        """
+        # ids are reused once the newest pose is removed, the generation never is
+        generation = self.generation(rig)
+        cached = self.searchIndex.get(rig)
+        if cached is None or cached[0] != generation:
+            layout = self.channelLayout(rig)
+            defaults = self.layoutDefaults(rig)
+            ids = []
+            vectors = []
+            for poseId, blob in self.db.execute('SELECT pose, vector FROM poseFeatures WHERE rig = ?', (rig,)):
+                vector = unpackVector(blob)
+                # older vectors cover a prefix of a layout that has grown since
+                vector.extend(defaults[len(vector):])
+                ids.append(poseId)
+                vectors.append(vector)
+            cached = (generation, ids, dict([(channel, i) for i, channel in enumerate(layout)]), defaults,
+                      poseSearch.KDTree(vectors))
+            self.searchIndex[rig] = cached
+        generation, ids, positions, defaults, tree = cached
+        matches = tree.query(featureVector(data, positions, defaults), k)
+        rows = dict([(row['id'], row) for row in self.rows([ids[i] for distance, i in matches])])
+        return [(distance, rows[ids[i]]) for distance, i in matches if ids[i] in rows]
+    
+    def rows(self, poseIds):
+        """
+        Return the index rows of the given pose ids
+        """
+        if not poseIds:
+            return []
+        sql = 'SELECT %s FROM poses WHERE id IN (%s)' % (', '.join(kColumns), ', '.join(['?'] * len(poseIds)))
+        return [dict(zip(kColumns, row)) for row in self.db.execute(sql, list(poseIds))]
+
+    def query(self, name=None, rig=None, tags=(), node=None, limit=100, offset=0):
+        """
+        Return index rows as dicts, newest first, without touching pose files.
+        name matches anywhere in the pose name, a pose must carry all of tags
+        and node must be one of the nodes the pose stores.
+        """
+        where = []
+        args = []
+        if name:
+            where.append('name LIKE ?')
+            args.append('%%%s%%' % name)
+        if rig is not None:
+            where.append('rig = ?')
+            args.append(rig)
+        if node is not None:
+            where.append('id IN (SELECT pose FROM poseNodes WHERE node = ?)')
+            args.append(node)
+        if tags:
+            where.append('id IN (SELECT pose FROM poseTags WHERE tag IN (%s) '
+                         'GROUP BY pose HAVING COUNT(*) = ?)' % ', '.join(['?'] * len(tags)))
+            args.extend(tags)
+            args.append(len(set(tags)))
+        sql = 'SELECT %s FROM poses' % ', '.join(kColumns)
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY modified DESC LIMIT ? OFFSET ?'
+        args.extend([limit, offset])
+        return [dict(zip(kColumns, row)) for row in self.db.execute(sql, args)]
+
+    def count(self):
+        return self.db.execute('SELECT COUNT(*) FROM poses').fetchone()[0]
+
+    def tags(self, poseId):
+        return [row[0] for row in self.db.execute('SELECT tag FROM poseTags WHERE pose = ? ORDER BY tag', (poseId,))]
+
+    def nodes(self, poseId):
+        return [row[0] for row in self.db.execute('SELECT node FROM poseNodes WHERE pose = ?', (poseId,))]
+
+    def setTags(self, poseId, tags):
+        """
+        Replace the tags of a pose
+        """
+        self.db.execute('DELETE FROM poseTags WHERE pose = ?', (poseId,))
+        self.db.executemany('INSERT OR IGNORE INTO poseTags (pose, tag) VALUES (?, ?)',
+                            [(poseId, tag) for tag in tags])
+        self.db.execute('UPDATE poses SET modified = ? WHERE id = ?', (time.time(), poseId))
+        self.db.commit()
+
+    def preview(self, poseId):
+        """
+        Return the preview image data of a pose, or None
+        """
+        row = self.db.execute('SELECT preview FROM poses WHERE id = ?', (poseId,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return bytes(row[0])
+
+    def filePath(self, poseId):
+        """
+        Return the path of the pose file holding the payload of a pose
+        """
+        row = self.db.execute('SELECT file FROM poses WHERE id = ?', (poseId,)).fetchone()
+        if row is None:
+            raise KeyError('No pose with id %s' % poseId)
+        return os.path.join(self.root, kPoseFolder, row[0])
+
+    def channels(self, poseId):
+        """
+        Generate the (node, attr, value) channels of a pose, read from its file
+        only now
+        """
+        return poseFile.iterPose(self.filePath(poseId))
+
+    def remove(self, poseId):
+        """
+        Delete a pose from the index and its file from the library
+        """
+        filePath = self.filePath(poseId)
+        rig = self.db.execute('SELECT rig FROM poses WHERE id = ?', (poseId,)).fetchone()[0]
+        self.db.execute('DELETE FROM poses WHERE id = ?', (poseId,))
+        if rig is not None:
+            self.bumpGeneration(rig)
+        self.db.commit()
+        if os.path.exists(filePath):
+            os.remove(filePath)
+
+    def close(self):
+        self.db.close()
+
+def featureVector(data, positions, defaults=None):
+    """
+    Return the values of the pose dict data as a list ordered by positions, a
+    dict of (node, attr) -> index. Channels missing from the pose take their
+    value in defaults, a list in the same order, or 0.0.
+    """
+    if defaults is None:
+        vector = [0.0] * len(positions)
+    else:
+        vector = [float(value) for value in defaults]
+    for node, attr, value in poseFile.iterChannels(data):
+        i = positions.get((node, attr))
+        if i is not None:
+            try:
+                vector[i] = float(value)
+            except (TypeError, ValueError):
+                pass
+    return vector
+
+def packVector(vector):
+    return struct.pack('<%dd' % len(vector), *vector)
+
+def unpackVector(blob):
+    blob = bytes(blob)
+    return list(struct.unpack('<%dd' % (len(blob) // 8), blob))
@@ -1,284 +1,1442 @@
-import maya.cmds as cmds
-import maya.mel as mel
-import os, cPickle, sys, time, pprint
-
-kPoseFileExtension = 'pse'
-
-def showUI():
-    """
-    A function to instantiate the pose manager window
-    """
-    return AR_PoseManagerWindow.showUI()
-
-class AR_PoseManagerWindow(object):
-    """
-    A class for a basic pose manager window
-    """
-    @classmethod
-    def showUI(cls):
-        """
-        A function to instantiate the pose manager window
-        """
-        # Create an instance
-        win = cls()
-        # create a window
-        win.create()
-        # return the instance
-        return win
-    
-    def __init__(self):
-        """
-        Initialize data attributes
-        """
-        # a unique window handle
-        self.window = 'ar_poseManagerWindow'
-        # window title
-        self.title = 'Pose Manager'
-        # window size
-        self.size = (300, 174)
-        if mel.eval('getApplicationVersionAsFloat()') > 2010.0:
-            self.size = (300, 150)
-        # a temporary file in a writable location for storing a copied pose
-        # os.path.expanduser('~') returns C:\\Users\\localhost', it expands ~ and ~user constructs;
-        # likewise, os.path.expanduser('~user') returns C:\\Users\\user',
-        self.tempFile = os.path.join(os.path.expanduser('~'), 'temp_pose.%s' % kPoseFileExtension)
-        # current clipboard status message
-        self.clipboardStat = 'No pose currently copied.'
-        if (os.path.exists(self.tempFile)):
-            self.clipboardStat = 'Old pose currently copied to clipboard.'
-        # file filter to display in file browsers
-        self.fileFilter = 'Pose (*.%s)' % kPoseFileExtension
-    
-    def create(self):
-        """
-        Draw the window
-        """
-        # delete the window if its handle exists
-        if(cmds.window(self.window, exists=True)):
-            cmds.deleteUI(self.window, window=True)
-        # initialize the window
-        self.window = cmds.window(self.window, title=self.title, widthHeight=self.size, sizeable=False)
-        # main form layout
-        self.mainForm = cmds.formLayout()
-        # frameLayout below window for copy and paste poses
-        self.copyPasteFrame = cmds.frameLayout(label='Copy and Paste Poses')
-        # formLayout inside of frame
-        self.copyPasteForm = cmds.formLayout()
-        # create buttons in a 2-column grid
-        self.copyPasteGrid = cmds.gridLayout(cellWidth=(self.size[0]/2)-2, numberOfColumns=2)
-        # create two buttons for copy and paste
-        self.copyBtn = cmds.button(label='Copy Pose', command=self.copyBtnCmd)
-        self.pasteBtn = cmds.button(label='Paste Pose', command=self.pasteBtnCmd)
-        # set parent to self.copyPasteForm
-        cmds.setParent(self.copyPasteForm)
-        # scroll view with label for clipboard status
-        self.clipboardLayout = cmds.scrollLayout(height=42, width=self.size[0]-4)
-        self.clipboardLb = cmds.text(label=self.clipboardStat)
-        # attach controls in the copyPaste form
-        at_c = []; at_f = []
-        at_c.append([self.clipboardLayout, 'top', 0, self.copyPasteGrid])
-        at_f.append([self.copyPasteGrid, 'top', 0])
-        at_f.append([self.clipboardLayout, 'bottom', 0])
-        cmds.formLayout(self.copyPasteForm, edit=True, attachControl= at_c, attachForm=at_f)
-        # set parent to self.mainForm
-        cmds.setParent(self.mainForm)
-        # frameLayout for saving and loading poses
-        self.loadSaveFrame = cmds.frameLayout(label='Save and load Poses')
-        # create buttons in a 2-column grid
-        self.loadSaveBtnLayout = cmds.gridLayout(cellWidth=(self.size[0]/2)-2, numberOfColumns=2)
-        self.saveBtn = cmds.button(label='Save Pose', command=self.saveBtnCmd)
-        self.loadBtn = cmds.button(label='Load Pose', command=self.loadBtnCmd)
-        # now attach frames to self.mainForm
-        at_c = []; at_f = []
-        at_c.append([self.loadSaveFrame, 'top', 0, self.copyPasteFrame])
-        at_f.append([self.copyPasteFrame, 'top', 0])
-        at_f.append([self.copyPasteFrame, 'left', 0])
-        at_f.append([self.copyPasteFrame, 'right', 0])
-        at_f.append([self.loadSaveFrame, 'bottom', 0])
-        at_f.append([self.loadSaveFrame, 'left', 0])
-        at_f.append([self.loadSaveFrame, 'right', 0])
-        cmds.formLayout(self.mainForm, edit=True, attachControl=at_c,attachForm=at_f)
-        # show the window
-        cmds.showWindow(self.window)
-        
-    def getSelection(self):
-        """
-        Get current selection, and check if it's a transform
-        """
-        rootNodes = cmds.ls(selection=True, type='transform')
-        #for node in rootNodes:
-        #    nt = cmds.nodeType(node)
-        #    if nt == 'transform' or nt == 'joint':
-        #        res.append(node)
-        if rootNodes is None or len(rootNodes) < 1:
-            cmds.confirmDialog(title='Error', message='Please select one or more transform nodes.', button='OK')
-            return None
-        return rootNodes
-    
-    def copyBtnCmd(self, *args):
-        """
-        Called when the Copy Pose button is pressed
-        """
-        rootNodes = self.getSelection()
-        if rootNodes is None:
-            return
-        # edit the label text for clipboard status
-        cmds.text(self.clipboardLb, edit=True, label='Pose copied at %s for %s.' %
-                                # representing time in a str format. %I-(Hour in decimal in 12-hour clock)
-                                # %M-(Minute as a decimal number
-                                (time.strftime('%I:%M'),
-                                # join transform names with commas as a single unicode or str
-                                ', '.join(rootNodes)))
-        # export the pose of selected transforms to the self.tempFile
-        self.exportPose(self.tempFile, rootNodes)
-    
-    def pasteBtnCmd(self, *args):
-        """
-        Called when the Paste Pose button is pressed
-        """
-        if not os.path.exists(self.tempFile):
-            return
-        self.importPose(self.tempFile)
-    
-    def saveBtnCmd(self, *args):
-        """
-        Called when the Save Pose button is pressed
-        """
-        rootNodes = self.getSelection()
-        if rootNodes is None:
-            return
-        # get the file path using fileDialog
-        # Maya 2011 and newer use fileDialog2
-        try:
-            filePath = cmds.fileDialog2(fileFilter=self.fileFilter, fileMode=0)
-        # BUG: Maya 2008 and older may, on some versions of OS X, return the
-        # path with no separator between the directory and file names:
-        # e.g., /users/adam/Desktopuntitled.pse 
-        except:
-            filePath = cmds.fileDialog(directoryMask='*.%s' % kPoseFileExtension, mode=1)
-        # early out of the dialog was cancelled
-        if filePath is None or len(filePath) < 1:
-            return
-        if isinstance(filePath, list):
-            filePath = filePath[0]
-            self.exportPose(filePath, self.getSelection())
-    
-    def loadBtnCmd(self, *args):
-        """
-        Called when the Load Pose Button is pressed
-        """
-        # Maya 2011 and newer use fileDialog2
-        try:
-            filePath = cmds.fileDialog2(fileFilter=self.fileFilter, fileMode=1)
-        except:
-            filePath = cmds.fileDialog(directoryMask='*.%s' % kPoseFileExtension, mode=0)
-        # early out of the dialog was cancelled
-        if filePath is None or len(filePath) < 1:
-            return
-        if isinstance(filePath, list):
-            filePath = filePath[0]
-            self.importPose(filePath)
-    
-    def exportPose(self, filePath, rootNodes):      
-        """
-        Save a pose file at filePath for rootNodes and their children
-        """
-        print filePath
-        print rootNodes 
-        # try to open the file
-        try:
-            f = open(filePath, 'w')
-        except IOError:
-            cmds.confirmDialog(title='Error', button='OK', message='Unable to write file: %s' % filePath)
-            raise
-        # built a list of hierarchy data
-        data = self.saveHierarchy(rootNodes, {})
-        # pickle the serialized data
-        cPickle.dump(data, f)
-        # close the file
-        f.close()
-    
-    def saveHierarchy(self, rootNodes, data):
-        """
-        Append attribute values for all keyable attributes to data array
-        """
-        # iterate through supplied nodes
-        for node in rootNodes:
-            keyableAttrs = cmds.listAttr(node, keyable=True)
-            if keyableAttrs:
-                for attr in keyableAttrs:
-                    data[node] = data.get(node, []) + [[attr, cmds.getAttr('%s.%s'%(node,attr))]]
-            # if there are children, repeat
-            children = cmds.listRelatives(node, children=True)
-            if children:
-                self.saveHierarchy(children, data)
-        return data
-    
-    def importPose(self, filePath):
-        """
-        Import the pose data stored in filePath
-        """
-        # try to open the file
-        try:
-            f = open(filePath, 'r')
-        except IOError:
-            cmds.confirmDialog(title='Error', button='OK', message='Unable to open file: %s' % filePath)
-            raise
-        # unpickle the data
-        data = cPickle.load(f)
-        # close the file
-        f.close()
-        # set the attributes for stored pose
-        errAttrs = {}
-        for node in data:
-            for attr in data[node]:
-                try:
-                    cmds.setAttr('%s.%s' % (node, attr[0]), attr[-1])
-                except:
-                    errAttrs[node] = errAttrs.get(node, []) + [[attr[0], attr[-1]]]
-        # display error message if needed
-        if len(errAttrs) > 0:
-            self.importErrorWindow(errAttrs)
-            sys.stderr.write('Not all attributes could be loaded.')
-            #cmds.warning("Not all attributes could be loaded.")
-    
-    def importErrorWindow(self, errAttrs):
-        """
-        An error window to display if there are unknown attributes when importing a pose
-        """
-        win = 'ar_errorWindow'
-        # kill the window if it exists
-        if cmds.window(win, exists=True):
-            cmds.deleteUI(win, window=True)
-        # create the window
-        cmds.window(win, title='Unknown Attributes', widthHeight=(300, 200), sizeable=False)
-        # create a formLayout for window
-        errorForm = cmds.formLayout()
-        # info label
-        infoLb = cmds.text(label='The following attributes can\'t be found.'
-                            '\nThey\'re being ignored.', align='left')
-        # display a list of attributes that could not be loaded
-        scroller = cmds.scrollLayout(width=300)
-        errStr = ''
-        for node in errAttrs:
-            for item in errAttrs[node]:
-                errStr += '{0:<15}-({1:<15}:{2:.2f})\n'.format(str(node), item[0], item[-1])
-        # create a text control inside scrollLayout
-        cmds.text(label=errStr, align='left')
-        # create a button to dismiss the window
-        btn = cmds.button(label='OK', parent=errorForm, height=26, command=cmds.deleteUI(win, window=True))
-        # attach controls
-        cmds.formLayout(errorForm, edit=True, attachControl=
-                        ([scroller, 'top', 5, infoLb],
-                         [scroller, 'bottom', 5, btn]),
-                        attachForm=
-                        ([infoLb, 'top', 5],
-                         [infoLb, 'left', 5],
-                         [infoLb, 'right', 5],
-                         [scroller, 'left', 0],
-                         [scroller, 'right', 0],
-                         [btn, 'left', 5],
-                         [btn, 'right', 5],
-                         [btn, 'bottom', 5]))
-        # show the window
-        cmds.showWindow(win)
\ No newline at end of file
+import maya.cmds as cmds
+import maya.mel as mel
+import maya.OpenMaya as om
+import maya.OpenMayaAnim as oma
+import os, cPickle, sys, time, pprint, functools, tempfile, itertools, operator, csv
+# pose file formats, binary and legacy pickle
+import P_maya_c7_poseFile as poseFile
+# indexed pose library
+import P_maya_c7_poseLibrary as poseLibrary
+# weighted pose blends
+import P_maya_c7_poseBlend as poseBlend
+# animation clip files
+import P_maya_c7_poseClip as poseClip
+
+kPoseFileExtension = 'pse'
+kClipFileExtension = 'clp'
+# the scripted plug-in applying a pose as one undoable command, next to this file
+kApplyPosePlugin = 'P_maya_API_applyPoseCmd'
+
+# the in-process pose clipboard, shared by all pose manager windows
+clipboard = poseFile.PoseClipboard(maxEntries=10)
+# scriptJob saving the latest copied pose when Maya quits
+clipboardJob = None
+# recently loaded pose files, reused while the files are unchanged
+poseCache = poseFile.PoseFileCache(maxEntries=20)
+# a PlugResolver per rig namespace, updated when nodes are renamed
+plugResolvers = {}
+# ids of the MMessage callbacks updating plugResolvers. A reload keeps the module's
+# globals until they are assigned again, so the callbacks of the previous load go here
+for callbackId in globals().get('resolverCallbacks', []):
+    om.MMessage.removeCallback(callbackId)
+resolverCallbacks = []
+# (node type, attr) -> default value in UI units of static attributes
+attributeDefaults = {}
+# values this close to an attribute's default count as the default
+kDefaultEpsilon = 1e-6
+# failures listed per page of the import error window
+kErrorPageSize = 200
+# frames either side of a clip range end over which the curve's slope is measured
+kSlopeFrames = 1e-3
+
+def showUI():
+    """
+    A function to instantiate the pose manager window
+    """
+    return AR_PoseManagerWindow.showUI()
+
+def iterHierarchy(rootNodes):
+    """
+    Generate an MDagPath for each of rootNodes and all of their descendants,
+    depth first
+    """
+    selection = om.MSelectionList()
+    for node in rootNodes:
+        selection.add(node)
+    dagIt = om.MItDag(om.MItDag.kDepthFirst, om.MFn.kInvalid)
+    for i in range(selection.length()):
+        root = om.MDagPath()
+        selection.getDagPath(i, root)
+        dagIt.reset(root, om.MItDag.kDepthFirst, om.MFn.kInvalid)
+        while not dagIt.isDone():
+            dagPath = om.MDagPath()
+            dagIt.getPath(dagPath)
+            yield dagPath
+            dagIt.next()
+
+def iterKeyablePlugs(obj):
+    """
+    Generate (attr, plug) for every keyable scalar attribute of the node obj
+    """
+    fnNode = om.MFnDependencyNode(obj)
+    for i in range(fnNode.attributeCount()):
+        attr = fnNode.attribute(i)
+        plug = om.MPlug(obj, attr)
+        if not plug.isKeyable() or plug.isCompound() or plug.isArray() or isInArray(attr):
+            continue
+        yield (attr, plug)
+
+def readKeyablePlugs(obj, sparse=False, precision=None):
+    """
+    Return [[attr, value], ...] for every keyable attribute of the node obj,
+    read through its plugs. Values are in UI units, as cmds.getAttr returns them.
+    sparse leaves out attributes at their default value and attributes that
+    are locked or driven by anything but an animation curve; a node left with
+    nothing keeps its first attribute, so the pose still resets it.
+    A precision rounds floating point values to its multiples.
+    """
+    values = []
+    first = None
+    typeName = om.MFnDependencyNode(obj).typeName() if sparse else None
+    for attr, plug in iterKeyablePlugs(obj):
+        kind = plugKind(attr)
+        value = plugValue(plug, attr, kind)
+        if precision and kind in ('angle', 'distance', 'time', 'double'):
+            value = round(value / precision) * precision
+        item = [om.MFnAttribute(attr).name(), value]
+        if sparse:
+            if not plugWritable(plug):
+                continue
+            if first is None:
+                first = item
+            default = cachedDefault(typeName, attr, kind)
+            if default is not None and not valuesDiffer(value, default, max(precision or 0.0, kDefaultEpsilon)):
+                continue
+        values.append(item)
+    if not values and first is not None:
+        values.append(first)
+    return values
+
+def attributeDefault(attr, kind):
+    """
+    Return the default value of a scalar attribute in UI units, kind being what
+    plugKind() returned, or None if it is not known
+    """
+    if kind in ('angle', 'distance', 'time'):
+        fnAttr = om.MFnUnitAttribute(attr)
+        if kind == 'angle':
+            default = om.MAngle()
+            fnAttr.getDefault(default)
+            return default.asUnits(om.MAngle.uiUnit())
+        if kind == 'distance':
+            default = om.MDistance()
+            fnAttr.getDefault(default)
+            return default.asUnits(om.MDistance.uiUnit())
+        default = om.MTime()
+        fnAttr.getDefault(default)
+        return default.asUnits(om.MTime.uiUnit())
+    if attr.hasFn(om.MFn.kNumericAttribute) and kind in ('bool', 'int', 'double'):
+        util = om.MScriptUtil()
+        ptr = util.asDoublePtr()
+        om.MFnNumericAttribute(attr).getDefault(ptr)
+        return om.MScriptUtil.getDouble(ptr)
+    if attr.hasFn(om.MFn.kEnumAttribute):
+        util = om.MScriptUtil()
+        ptr = util.asShortPtr()
+        om.MFnEnumAttribute(attr).getDefault(ptr)
+        return om.MScriptUtil.getShort(ptr)
+    return None
+
+def cachedDefault(typeName, attr, kind):
+    """
+    Return attributeDefault(attr, kind), looked up once per node type for the
+    static attributes of typeName
+    """
+    fnAttr = om.MFnAttribute(attr)
+    if fnAttr.isDynamic():
+        return attributeDefault(attr, kind)
+    key = (typeName, fnAttr.name())
+    if key not in attributeDefaults:
+        attributeDefaults[key] = attributeDefault(attr, kind)
+    return attributeDefaults[key]
+
+def readDefaultValues(node):
+    """
+    Return [[attr, default], ...] for the writable keyable attributes of node
+    with a known default, or an empty list if node does not exist
+    """
+    selection = om.MSelectionList()
+    try:
+        selection.add(node)
+    except RuntimeError:
+        return []
+    obj = om.MObject()
+    selection.getDependNode(0, obj)
+    typeName = om.MFnDependencyNode(obj).typeName()
+    defaults = []
+    for attr, plug in iterKeyablePlugs(obj):
+        if not plugWritable(plug):
+            continue
+        default = cachedDefault(typeName, attr, plugKind(attr))
+        if default is not None:
+            defaults.append([om.MFnAttribute(attr).name(), default])
+    return defaults
+
+def channelDefaults(nodes):
+    """
+    Return a dict of (node, attr) -> default value for the writable keyable
+    attributes of nodes
+    """
+    defaults = {}
+    for node in nodes:
+        for attr, default in readDefaultValues(node):
+            defaults[(node, attr)] = default
+    return defaults
+
+def iterWithDefaults(channels):
+    """
+    Generate (node, attr, value) channels, each node's stored channels followed
+    by the default values of the attributes a sparse pose left out.
+    The channels of a node must come together.
+    """
+    for node, group in itertools.groupby(channels, operator.itemgetter(0)):
+        stored = set()
+        for channel in group:
+            stored.add(channel[1])
+            yield channel
+        for attr, default in readDefaultValues(node):
+            if attr not in stored:
+                yield (node, attr, default)
+
+def rigName(rootNodes):
+    """
+    Return the rig name of a pose: the namespace of the first root, or the
+    root itself
+    """
+    return rootNodes[0].rpartition(':')[0] or rootNodes[0]
+
+def readCurrentValues(node):
+    """
+    Return a dict of attr -> value for the keyable attributes of node as they
+    are now, or an empty dict if node does not exist
+    """
+    selection = om.MSelectionList()
+    try:
+        selection.add(node)
+    except RuntimeError:
+        return {}
+    obj = om.MObject()
+    selection.getDependNode(0, obj)
+    return dict(readKeyablePlugs(obj))
+
+def valuesDiffer(current, value, epsilon):
+    """
+    Return whether a stored value differs from the current one by more than epsilon
+    """
+    try:
+        return abs(float(current) - float(value)) > epsilon
+    except (TypeError, ValueError):
+        return current != value
+
+def isInArray(attr):
+    """
+    Return whether attr is the child of an array attribute, which has no value
+    without an index
+    """
+    parent = om.MFnAttribute(attr).parent()
+    while not parent.isNull():
+        fnParent = om.MFnAttribute(parent)
+        if fnParent.isArray():
+            return True
+        parent = fnParent.parent()
+    return False
+
+def plugKind(attr):
+    """
+    Return how the value of a scalar attribute is read and written: 'angle',
+    'distance', 'time', 'bool', 'int', 'double', or None when only getAttr and
+    setAttr know
+    """
+    if attr.hasFn(om.MFn.kUnitAttribute):
+        unitType = om.MFnUnitAttribute(attr).unitType()
+        if unitType == om.MFnUnitAttribute.kAngle:
+            return 'angle'
+        if unitType == om.MFnUnitAttribute.kDistance:
+            return 'distance'
+        if unitType == om.MFnUnitAttribute.kTime:
+            return 'time'
+    elif attr.hasFn(om.MFn.kNumericAttribute):
+        numericType = om.MFnNumericAttribute(attr).unitType()
+        if numericType == om.MFnNumericData.kBoolean:
+            return 'bool'
+        if numericType in (om.MFnNumericData.kByte, om.MFnNumericData.kChar, om.MFnNumericData.kShort,
+                           om.MFnNumericData.kInt, om.MFnNumericData.kLong):
+            return 'int'
+    elif attr.hasFn(om.MFn.kEnumAttribute):
+        return 'int'
+    else:
+        return None
+    return 'double'
+
+def plugValue(plug, attr, kind=None):
+    """
+    Return the value of a scalar plug, converting angles, distances and times
+    from internal to UI units
+    """
+    if kind is None:
+        kind = plugKind(attr)
+    if kind == 'angle':
+        return plug.asMAngle().asUnits(om.MAngle.uiUnit())
+    if kind == 'distance':
+        return plug.asMDistance().asUnits(om.MDistance.uiUnit())
+    if kind == 'time':
+        return plug.asMTime().asUnits(om.MTime.uiUnit())
+    if kind == 'bool':
+        return plug.asBool()
+    if kind == 'int':
+        return plug.asInt()
+    if kind == 'double':
+        return plug.asDouble()
+    # anything else, let getAttr work out the type
+    return cmds.getAttr(plug.name())
+
+def setPlugValue(plug, kind, value):
+    """
+    Set a scalar plug to a value in UI units, kind being what plugKind() returned
+    """
+    if kind == 'angle':
+        plug.setMAngle(om.MAngle(value, om.MAngle.uiUnit()))
+    elif kind == 'distance':
+        plug.setMDistance(om.MDistance(value, om.MDistance.uiUnit()))
+    elif kind == 'time':
+        plug.setMTime(om.MTime(value, om.MTime.uiUnit()))
+    elif kind == 'bool':
+        plug.setBool(bool(round(value)))
+    elif kind == 'int':
+        plug.setInt(int(round(value)))
+    elif kind == 'double':
+        plug.setDouble(value)
+    else:
+        cmds.setAttr(plug.name(), value)
+
+def resolvePlug(node, attr):
+    """
+    Return (plug, kind) for node.attr, or None if there is no such plug
+    """
+    selection = om.MSelectionList()
+    try:
+        selection.add('%s.%s' % (node, attr))
+    except RuntimeError:
+        return None
+    plug = om.MPlug()
+    selection.getPlug(0, plug)
+    return (plug, plugKind(plug.attribute()))
+
+def resolvePlugs(channels):
+    """
+    Return a list of (plug, kind) for (node, attr) channels, None where a
+    channel does not resolve
+    """
+    return [resolvePlug(node, attr) for node, attr in channels]
+
+def plugWritable(plug):
+    """
+    Return whether setting plug can succeed: it is not locked and is driven
+    by nothing but, possibly, an animation curve
+    """
+    if plug.isLocked():
+        return False
+    sources = om.MPlugArray()
+    plug.connectedTo(sources, True, False)
+    for i in range(sources.length()):
+        if not sources[i].node().hasFn(om.MFn.kAnimCurve):
+            return False
+    return True
+
+def formatErrorRow(node, attr, value):
+    """
+    Return one line of the import error window
+    """
+    try:
+        return '{0:<15}-({1:<15}:{2:.2f})'.format(str(node), attr, value)
+    except (ValueError, TypeError):
+        return '{0:<15}-({1:<15}:{2})'.format(str(node), attr, value)
+
+def writeErrorCsv(filePath, errAttrs):
+    """
+    Write the failures of errAttrs, a dict of node -> [[attr, value], ...], to
+    a CSV file with a node, attribute, value header
+    """
+    f = open(filePath, 'wb')
+    try:
+        writer = csv.writer(f)
+        writer.writerow(['node', 'attribute', 'value'])
+        for node in errAttrs:
+            writer.writerows([[node, item[0], item[-1]] for item in errAttrs[node]])
+    finally:
+        f.close()
+
+class PlugResolver(object):
+    """
+    Cache of node.attr names to plugs for one rig
+    """
+    def __init__(self):
+        # (node, attr) -> (MObjectHandle, plug, kind)
+        self.plugs = {}
+        # name of every node in the cached node paths -> keys of self.plugs
+        self.byName = {}
+    
+    def resolve(self, node, attr):
+        """
+        Return (plug, kind) for node.attr like resolvePlug(), from the cache
+        while the node is alive. Entries of deleted nodes are resolved again.
+        Missing plugs are not cached, they may be created later.
+        """
+        key = (node, attr)
+        cached = self.plugs.get(key)
+        if cached is not None and cached[0].isValid():
+            return cached[1:]
+        resolved = resolvePlug(node, attr)
+        if resolved is not None:
+            self.plugs[key] = (om.MObjectHandle(resolved[0].node()),) + resolved
+            for name in node.split('|'):
+                self.byName.setdefault(name, set()).add(key)
+        else:
+            self.plugs.pop(key, None)
+        return resolved
+    
+    def forget(self, name):
+        """
+        Drop the entries whose node path goes through a node called name
+        """
+        for key in self.byName.pop(name, ()):
+            self.plugs.pop(key, None)
+    
+    def clear(self):
+        self.plugs.clear()
+        self.byName.clear()
+
+def clearPlugResolvers(*args):
+    """
+    Forget all resolved plugs, called back when a scene is replaced
+    """
+    for resolver in plugResolvers.values():
+        resolver.clear()
+
+def forgetRenamedNode(node, prevName, *args):
+    """
+    Forget the plugs resolved through the old name of a renamed node, whose
+    path names now lead elsewhere or nowhere. Deleted nodes need nothing,
+    their entries fail the handle check.
+    """
+    if not prevName:
+        # a node being named on creation
+        return
+    for resolver in plugResolvers.values():
+        resolver.forget(prevName)
+
+def getPlugResolver(node):
+    """
+    Return the PlugResolver of the rig node belongs to, by namespace
+    """
+    if not resolverCallbacks:
+        resolverCallbacks.append(om.MNodeMessage.addNameChangedCallback(om.MObject(), forgetRenamedNode))
+        # a new scene has none of the cached nodes
+        resolverCallbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeNew, clearPlugResolvers))
+        resolverCallbacks.append(om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeOpen, clearPlugResolvers))
+    rig = node.rpartition(':')[0]
+    if rig not in plugResolvers:
+        plugResolvers[rig] = PlugResolver()
+    return plugResolvers[rig]
+
+def addPlugValue(modifier, plug, kind, value):
+    """
+    Add setting a scalar plug to a value in UI units to an MDGModifier, kind
+    being what plugKind() returned
+    """
+    if kind == 'angle':
+        modifier.newPlugValueMAngle(plug, om.MAngle(value, om.MAngle.uiUnit()))
+    elif kind == 'distance':
+        modifier.newPlugValueMDistance(plug, om.MDistance(value, om.MDistance.uiUnit()))
+    elif kind == 'time':
+        modifier.newPlugValueMTime(plug, om.MTime(value, om.MTime.uiUnit()))
+    elif kind == 'bool':
+        modifier.newPlugValueBool(plug, bool(round(value)))
+    elif kind == 'int':
+        modifier.newPlugValueInt(plug, int(round(value)))
+    elif kind == 'double':
+        modifier.newPlugValueDouble(plug, value)
+    else:
+        modifier.commandToExecute('setAttr "%s" %r' % (plug.name(), value))
+
+def applyModifier(modifier):
+    """
+    Run modifier through the arApplyPose command, as one undoable step.
+    modifier is an MDGModifier or any object with its doIt() and undoIt(),
+    such as a ClipImport. Without the plug-in the modifier still runs, but
+    cannot be undone.
+    """
+    if not cmds.pluginInfo(kApplyPosePlugin, query=True, loaded=True):
+        try:
+            cmds.loadPlugin(os.path.join(os.path.dirname(os.path.abspath(__file__)), kApplyPosePlugin + '.py'))
+        except RuntimeError:
+            sys.stderr.write('Unable to load %s, the pose cannot be undone.\n' % kApplyPosePlugin)
+            modifier.doIt()
+            return
+    # the hand-off slot lives in the plug-in module Maya loaded, whatever this module is called
+    plugin = sys.modules.get(kApplyPosePlugin)
+    if plugin is None:
+        plugin = __import__(kApplyPosePlugin)
+    plugin.pendingModifier = modifier
+    cmds.arApplyPose()
+
+def writePlugs(plugs, values):
+    """
+    Write values straight to pre-resolved plugs, skipping unresolved ones.
+    Nothing goes to the undo queue.
+    """
+    for resolved, value in zip(plugs, values):
+        if resolved is not None:
+            setPlugValue(resolved[0], resolved[1], float(value))
+
+def findAnimCurve(plug):
+    """
+    Return an MFnAnimCurve for the curve driving plug, or None if plug is not
+    driven by exactly one animation curve
+    """
+    curves = om.MObjectArray()
+    if not oma.MAnimUtil.findAnimation(plug, curves) or curves.length() != 1:
+        return None
+    if not curves[0].hasFn(om.MFn.kAnimCurve):
+        return None
+    return oma.MFnAnimCurve(curves[0])
+
+def readCurveKeys(node, attrName, fnCurve, start, end):
+    """
+    Return a poseClip.ClipChannel with the keys of fnCurve from frame start to
+    end, reading only the curve's keys. Where the curve has keys outside the
+    range, its value and slope at start and end are keyed, with fixed
+    tangents, so the range plays back the same.
+    """
+    channel = poseClip.ClipChannel(node, attrName, curveType=fnCurve.animCurveType())
+    unit = om.MTime.uiUnit()
+    # tangents are returned through pointers, reused for every key
+    xUtil = om.MScriptUtil(); xPtr = xUtil.asFloatPtr()
+    yUtil = om.MScriptUtil(); yPtr = yUtil.asFloatPtr()
+    numKeys = fnCurve.numKeys()
+    first = None
+    last = None
+    for i in range(numKeys):
+        frame = fnCurve.time(i).asUnits(unit)
+        if frame < start or frame > end:
+            continue
+        if first is None:
+            first = i
+        last = i
+        tangent = []
+        for isIn in (True, False):
+            fnCurve.getTangent(i, xPtr, yPtr, isIn)
+            tangent.extend([om.MScriptUtil.getFloat(xPtr), om.MScriptUtil.getFloat(yPtr)])
+        channel.times.append(frame)
+        channel.values.append(fnCurve.value(i))
+        channel.inTypes.append(fnCurve.inTangentType(i))
+        channel.outTypes.append(fnCurve.outTangentType(i))
+        channel.tangents.append(tuple(tangent))
+    # key the range ends where the curve goes on past them
+    fixed = oma.MFnAnimCurve.kTangentFixed
+    if first is None or (first > 0 and channel.times[0] > start):
+        value, tangent = rangeEndKey(fnCurve, start, unit)
+        channel.times.insert(0, float(start))
+        channel.values.insert(0, value)
+        channel.inTypes.insert(0, fixed); channel.outTypes.insert(0, fixed)
+        channel.tangents.insert(0, tangent)
+    if last is None or (last < numKeys - 1 and channel.times[-1] < end):
+        value, tangent = rangeEndKey(fnCurve, end, unit)
+        channel.times.append(float(end))
+        channel.values.append(value)
+        channel.inTypes.append(fixed); channel.outTypes.append(fixed)
+        channel.tangents.append(tangent)
+    return channel
+
+def rangeEndKey(fnCurve, frame, unit):
+    """
+    Return the value of fnCurve at frame and the (in x, in y, out x, out y)
+    tangents of a key following the curve's slope on either side of it, one
+    frame long, in the internal units getTangent() uses
+    """
+    value = fnCurve.evaluate(om.MTime(frame, unit))
+    before = fnCurve.evaluate(om.MTime(frame - kSlopeFrames, unit))
+    after = fnCurve.evaluate(om.MTime(frame + kSlopeFrames, unit))
+    # tangent x is in seconds, y in the curve's internal units
+    seconds = om.MTime(1.0, unit).asUnits(om.MTime.kSeconds)
+    return (value, (seconds, (value - before) / kSlopeFrames, seconds, (after - value) / kSlopeFrames))
+
+def writeCurveKeys(plug, channel, start, end, modifier, change):
+    """
+    Replace the keys of plug from frame start to end with the keys of channel,
+    in one addKeys call, creating a curve through modifier if plug has none.
+    Curve edits are recorded in change, an MAnimCurveChange.
+    """
+    fnCurve = findAnimCurve(plug)
+    if fnCurve is None:
+        fnCurve = oma.MFnAnimCurve()
+        fnCurve.create(plug, channel.curveType, modifier)
+        modifier.doIt()
+    unit = om.MTime.uiUnit()
+    # remove the keys in the range, last first so indices stay valid
+    for i in reversed(range(fnCurve.numKeys())):
+        frame = fnCurve.time(i).asUnits(unit)
+        if start <= frame <= end:
+            fnCurve.remove(i, change)
+    times = om.MTimeArray()
+    values = om.MDoubleArray()
+    for frame, value in zip(channel.times, channel.values):
+        times.append(om.MTime(frame, unit))
+        values.append(value)
+    # the most common tangent types go with the keys, the others are set per key
+    inType = max(set(channel.inTypes), key=channel.inTypes.count)
+    outType = max(set(channel.outTypes), key=channel.outTypes.count)
+    fnCurve.addKeys(times, values, inType, outType, True, change)
+    fixed = oma.MFnAnimCurve.kTangentFixed
+    for frame, keyIn, keyOut, tangent in zip(channel.times, channel.inTypes, channel.outTypes, channel.tangents):
+        if keyIn == inType and keyOut == outType and fixed not in (keyIn, keyOut):
+            continue
+        i = fnCurve.findClosest(om.MTime(frame, unit))
+        if keyIn != inType:
+            fnCurve.setInTangentType(i, keyIn, change)
+        if keyOut != outType:
+            fnCurve.setOutTangentType(i, keyOut, change)
+        if keyIn == fixed:
+            fnCurve.setTangent(i, tangent[0], tangent[1], True, change, False)
+        if keyOut == fixed:
+            fnCurve.setTangent(i, tangent[2], tangent[3], False, change, False)
+
+class ClipImport(object):
+    """
+    The curve edits of a clip import. Like an MDGModifier, it is run by the
+    arApplyPose command with doIt() and undoIt(), so Maya's undo and redo
+    treat every curve of the clip as one step.
+    """
+    def __init__(self, clip):
+        self.clip = clip
+        # creates the curves of plugs that had none
+        self.modifier = om.MDGModifier()
+        # an MAnimCurveChange per written curve, None until the first doIt()
+        self.changes = None
+        # node -> [[attr, first value], ...] of the curves that could not be written
+        self.errAttrs = {}
+    
+    def doIt(self):
+        """
+        Write the curves of the clip, or redo them after an undo
+        """
+        if self.changes is not None:
+            self.modifier.doIt()
+            for change in self.changes:
+                change.redoIt()
+            return
+        self.changes = []
+        for channel in self.clip.channels:
+            if channel.isStatic():
+                continue
+            resolved = resolvePlug(channel.node, channel.attr)
+            if resolved is None:
+                self.errAttrs.setdefault(channel.node, []).append([channel.attr, channel.values[0]])
+                continue
+            change = oma.MAnimCurveChange()
+            writeCurveKeys(resolved[0], channel, self.clip.start, self.clip.end, self.modifier, change)
+            self.changes.append(change)
+    
+    def undoIt(self):
+        """
+        Revert the curve edits, last first, then delete the created curves
+        """
+        for change in reversed(self.changes or []):
+            change.undoIt()
+        self.modifier.undoIt()
+
+class AR_PoseManagerWindow(object):
+    """
+    A class for a basic pose manager window
+    """
+    @classmethod
+    def showUI(cls):
+        """
+        A function to instantiate the pose manager window
+        """
+        # Create an instance
+        win = cls()
+        # create a window
+        win.create()
+        # return the instance
+        return win
+    
+    def __init__(self):
+        """
+        Initialize data attributes
+        """
+        # a unique window handle
+        self.window = 'ar_poseManagerWindow'
+        # window title
+        self.title = 'Pose Manager'
+        # window size
+        self.size = (300, 270)
+        if mel.eval('getApplicationVersionAsFloat()') > 2010.0:
+            self.size = (300, 246)
+        # a temporary file in a writable location for storing a copied pose
+        # os.path.expanduser('~') returns C:\\Users\\localhost', it expands ~ and ~user constructs;
+        # likewise, os.path.expanduser('~user') returns C:\\Users\\user',
+        self.tempFile = os.path.join(os.path.expanduser('~'), 'temp_pose.%s' % kPoseFileExtension)
+        # current clipboard status message
+        self.clipboardStat = 'No pose currently copied.'
+        if (os.path.exists(self.tempFile)):
+            self.clipboardStat = 'Old pose currently copied to clipboard.'
+        if len(clipboard) > 0:
+            self.clipboardStat = '%d poses in clipboard history.' % len(clipboard)
+        # file filter to display in file browsers
+        self.fileFilter = 'Pose (*.%s)' % kPoseFileExtension
+        self.clipFileFilter = 'Clip (*.%s)' % kClipFileExtension
+        # clip curve values are quantized to, and held keys dropped within, clipTolerance
+        self.clipTolerance = 1e-4
+        # write poses in the binary format, False writes legacy pickles
+        self.binaryPoses = True
+        # (nodes, attributes, seconds) of the last capture
+        self.captureStats = None
+        # sparse poses leave out defaults, locked and driven attributes when
+        # captured, and are flagged so the left out attributes are reset to
+        # their defaults when applied, whatever this setting is then
+        self.sparsePoses = False
+        # round captured values to multiples of capturePrecision, None keeps them as they are
+        self.capturePrecision = None
+        # when importing, only write attributes whose value differs by more than deltaEpsilon
+        self.deltaApply = True
+        self.deltaEpsilon = 1e-6
+        # (written, unchanged) attribute counts of the last import
+        self.applyStats = None
+        # folder of the pose library, opened when first used
+        self.libraryDir = os.path.join(os.path.expanduser('~'), 'poseLibrary')
+        self.library = None
+        # ids of the poses listed in the library window, in list order
+        self.libraryIds = []
+        # blend between the current pose and the clipboard: the aligned poses and
+        # the plugs they write to, built when the slider first moves
+        self.blender = None
+        self.blendPlugs = None
+        # failures of the last import, its nodes by failure count and the rows
+        # and page shown in the error window
+        self.errAttrs = {}
+        self.errorNodes = []
+        self.errorRows = []
+        self.errorPage = 0
+    
+    def create(self):
+        """
+        Draw the window
+        """
+        # delete the window if its handle exists
+        if(cmds.window(self.window, exists=True)):
+            cmds.deleteUI(self.window, window=True)
+        # initialize the window
+        self.window = cmds.window(self.window, title=self.title, widthHeight=self.size, sizeable=False)
+        # main form layout
+        self.mainForm = cmds.formLayout()
+        # frameLayout below window for copy and paste poses
+        self.copyPasteFrame = cmds.frameLayout(label='Copy and Paste Poses')
+        # formLayout inside of frame
+        self.copyPasteForm = cmds.formLayout()
+        # create buttons in a 2-column grid
+        self.copyPasteGrid = cmds.gridLayout(cellWidth=(self.size[0]/2)-2, numberOfColumns=2)
+        # create two buttons for copy and paste
+        self.copyBtn = cmds.button(label='Copy Pose', command=self.copyBtnCmd)
+        self.pasteBtn = cmds.button(label='Paste Pose', command=self.pasteBtnCmd)
+        # set parent to self.copyPasteForm
+        cmds.setParent(self.copyPasteForm)
+        # slider blending from the current pose to the clipboard pose
+        self.blendSlider = cmds.floatSliderGrp(label='Blend', field=True, minValue=0.0, maxValue=1.0,
+                                               value=0.0, columnWidth3=(40, 50, self.size[0]-100),
+                                               dragCommand=self.blendSliderDrag,
+                                               changeCommand=self.blendSliderChange)
+        # scroll view with label for clipboard status
+        self.clipboardLayout = cmds.scrollLayout(height=42, width=self.size[0]-4)
+        self.clipboardLb = cmds.text(label=self.clipboardStat)
+        # attach controls in the copyPaste form
+        at_c = []; at_f = []
+        at_c.append([self.blendSlider, 'top', 0, self.copyPasteGrid])
+        at_c.append([self.clipboardLayout, 'top', 0, self.blendSlider])
+        at_f.append([self.copyPasteGrid, 'top', 0])
+        at_f.append([self.clipboardLayout, 'bottom', 0])
+        cmds.formLayout(self.copyPasteForm, edit=True, attachControl= at_c, attachForm=at_f)
+        # set parent to self.mainForm
+        cmds.setParent(self.mainForm)
+        # frameLayout for saving and loading poses
+        self.loadSaveFrame = cmds.frameLayout(label='Save and load Poses')
+        # create buttons in a 2-column grid
+        self.loadSaveBtnLayout = cmds.gridLayout(cellWidth=(self.size[0]/2)-2, numberOfColumns=2)
+        self.saveBtn = cmds.button(label='Save Pose', command=self.saveBtnCmd)
+        self.loadBtn = cmds.button(label='Load Pose', command=self.loadBtnCmd)
+        self.saveClipBtn = cmds.button(label='Save Clip', command=self.saveClipBtnCmd)
+        self.loadClipBtn = cmds.button(label='Load Clip', command=self.loadClipBtnCmd)
+        # set parent to self.mainForm
+        cmds.setParent(self.mainForm)
+        # frameLayout for the pose library
+        self.libraryFrame = cmds.frameLayout(label='Pose Library')
+        self.libraryBtnLayout = cmds.gridLayout(cellWidth=(self.size[0]/2)-2, numberOfColumns=2)
+        self.addLibraryBtn = cmds.button(label='Add to Library', command=self.addLibraryBtnCmd)
+        self.browseLibraryBtn = cmds.button(label='Browse Library', command=self.browseLibraryBtnCmd)
+        # now attach frames to self.mainForm
+        at_c = []; at_f = []
+        at_c.append([self.loadSaveFrame, 'top', 0, self.copyPasteFrame])
+        at_c.append([self.libraryFrame, 'top', 0, self.loadSaveFrame])
+        at_f.append([self.copyPasteFrame, 'top', 0])
+        at_f.append([self.copyPasteFrame, 'left', 0])
+        at_f.append([self.copyPasteFrame, 'right', 0])
+        at_f.append([self.loadSaveFrame, 'left', 0])
+        at_f.append([self.loadSaveFrame, 'right', 0])
+        at_f.append([self.libraryFrame, 'bottom', 0])
+        at_f.append([self.libraryFrame, 'left', 0])
+        at_f.append([self.libraryFrame, 'right', 0])
+        cmds.formLayout(self.mainForm, edit=True, attachControl=at_c,attachForm=at_f)
+        # show the window
+        cmds.showWindow(self.window)
+        
+    def getSelection(self):
+        """
+        Get current selection, and check if it's a transform
+        """
+        rootNodes = cmds.ls(selection=True, type='transform')
+        #for node in rootNodes:
+        #    nt = cmds.nodeType(node)
+        #    if nt == 'transform' or nt == 'joint':
+        #        res.append(node)
+        if rootNodes is None or len(rootNodes) < 1:
+            cmds.confirmDialog(title='Error', message='Please select one or more transform nodes.', button='OK')
+            return None
+        return rootNodes
+    
+    def copyBtnCmd(self, *args):
+        """
+        Called when the Copy Pose button is pressed
+        """
+        rootNodes = self.getSelection()
+        if rootNodes is None:
+            return
+        global clipboardJob
+        label = 'Pose copied at %s for %s.' % (
+                                # representing time in a str format. %I-(Hour in decimal in 12-hour clock)
+                                # %M-(Minute as a decimal number
+                                time.strftime('%I:%M:%S'),
+                                # join transform names with commas as a single unicode or str
+                                ', '.join(rootNodes))
+        # keep the pose of selected transforms in memory, the oldest copies are dropped
+        clipboard.copy(label, self.saveHierarchy(rootNodes))
+        # a new clipboard pose needs a new blend
+        self.resetBlend()
+        # edit the label text for clipboard status
+        cmds.text(self.clipboardLb, edit=True, label='%s (%d in history)' % (label, len(clipboard)))
+        # write the clipboard to self.tempFile only when Maya quits, for the next session
+        if clipboardJob is None:
+            clipboardJob = cmds.scriptJob(event=['quitApplication', functools.partial(clipboard.save, self.tempFile)])
+    
+    def pasteBtnCmd(self, *args):
+        """
+        Called when the Paste Pose button is pressed
+        """
+        # the pose being blended from is about to change
+        self.resetBlend()
+        channels = clipboard.paste()
+        if channels is not None:
+            self.applyPose(channels)
+            return
+        # nothing copied in this session, use the pose saved by the last one
+        if not os.path.exists(self.tempFile):
+            return
+        self.importPose(self.tempFile)
+    
+    def resetBlend(self):
+        """
+        Forget the current blend and put the slider back to the current pose
+        """
+        self.blender = None
+        self.blendPlugs = None
+        if cmds.floatSliderGrp(self.blendSlider, exists=True):
+            cmds.floatSliderGrp(self.blendSlider, edit=True, value=0.0)
+    
+    def prepareBlend(self):
+        """
+        Align the current pose with the clipboard pose and resolve their plugs,
+        once per blend. Return False if there is nothing to blend to.
+        """
+        if self.blender is not None:
+            return True
+        channels = clipboard.paste()
+        if channels is None:
+            return False
+        target = {}
+        for node, attr, value in channels:
+            target.setdefault(node, []).append([attr, value])
+        # the current values of the same channels, read in bulk per node
+        current = {}
+        for node in target:
+            values = readCurrentValues(node)
+            current[node] = [[item[0], values[item[0]]] for item in target[node] if item[0] in values]
+        self.blender = poseBlend.PoseBlender([current, target])
+        self.blendPlugs = resolvePlugs(self.blender.channels)
+        return True
+    
+    def blendSliderDrag(self, weight):
+        """
+        Called while the blend slider is dragged: write the blend straight to the
+        pre-resolved plugs, outside of the undo queue
+        """
+        if not self.prepareBlend():
+            return
+        writePlugs(self.blendPlugs, self.blender.blend([1.0 - weight, weight]))
+    
+    def blendSliderChange(self, weight):
+        """
+        Called when the blend slider is released: apply the final blend as one
+        undoable step, starting from the pose before the drag
+        """
+        if not self.prepareBlend():
+            return
+        writePlugs(self.blendPlugs, self.blender.blend([1.0, 0.0]))
+        cmds.undoInfo(openChunk=True)
+        try:
+            self.applyPose(poseFile.iterChannels(self.blender.blendPose([1.0 - weight, weight])))
+        finally:
+            cmds.undoInfo(closeChunk=True)
+    
+    def saveBtnCmd(self, *args):
+        """
+        Called when the Save Pose button is pressed
+        """
+        rootNodes = self.getSelection()
+        if rootNodes is None:
+            return
+        # get the file path using fileDialog
+        # Maya 2011 and newer use fileDialog2
+        try:
+            filePath = cmds.fileDialog2(fileFilter=self.fileFilter, fileMode=0)
+        # BUG: Maya 2008 and older may, on some versions of OS X, return the
+        # path with no separator between the directory and file names:
+        # e.g., /users/adam/Desktopuntitled.pse 
+        except:
+            filePath = cmds.fileDialog(directoryMask='*.%s' % kPoseFileExtension, mode=1)
+        # early out of the dialog was cancelled
+        if filePath is None or len(filePath) < 1:
+            return
+        if isinstance(filePath, list):
+            filePath = filePath[0]
+            self.exportPose(filePath, self.getSelection())
+    
+    def loadBtnCmd(self, *args):
+        """
+        Called when the Load Pose Button is pressed
+        """
+        # Maya 2011 and newer use fileDialog2
+        try:
+            filePath = cmds.fileDialog2(fileFilter=self.fileFilter, fileMode=1)
+        except:
+            filePath = cmds.fileDialog(directoryMask='*.%s' % kPoseFileExtension, mode=0)
+        # early out of the dialog was cancelled
+        if filePath is None or len(filePath) < 1:
+            return
+        if isinstance(filePath, list):
+            filePath = filePath[0]
+            self.importPose(filePath)
+    
+    def saveClipBtnCmd(self, *args):
+        """
+        Called when the Save Clip button is pressed, saves the playback range
+        """
+        rootNodes = self.getSelection()
+        if rootNodes is None:
+            return
+        filePath = cmds.fileDialog2(fileFilter=self.clipFileFilter, fileMode=0)
+        if not filePath:
+            return
+        start = cmds.playbackOptions(query=True, minTime=True)
+        end = cmds.playbackOptions(query=True, maxTime=True)
+        self.exportClip(filePath[0], rootNodes, start, end)
+    
+    def loadClipBtnCmd(self, *args):
+        """
+        Called when the Load Clip button is pressed
+        """
+        filePath = cmds.fileDialog2(fileFilter=self.clipFileFilter, fileMode=1)
+        if not filePath:
+            return
+        self.importClip(filePath[0])
+    
+    def getLibrary(self):
+        """
+        Return the pose library, opening it the first time
+        """
+        if self.library is None:
+            self.library = poseLibrary.PoseLibrary(self.libraryDir)
+        return self.library
+    
+    def addLibraryBtnCmd(self, *args):
+        """
+        Called when the Add to Library button is pressed
+        """
+        rootNodes = self.getSelection()
+        if rootNodes is None:
+            return
+        # ask for a name and comma separated tags
+        result = cmds.promptDialog(title='Add to Library', message='Name, tags (comma separated):',
+                                   button=['OK', 'Cancel'], defaultButton='OK', cancelButton='Cancel')
+        if result != 'OK':
+            return
+        fields = [field.strip() for field in cmds.promptDialog(query=True, text=True).split(',')]
+        if not fields[0]:
+            return
+        rig = rigName(rootNodes)
+        data = self.saveHierarchy(rootNodes)
+        self.getLibrary().add(fields[0], data, rig, [tag for tag in fields[1:] if tag], self.capturePreview(),
+                              channelDefaults(data))
+    
+    def capturePreview(self):
+        """
+        Return a small png of the current frame in the active view, or None
+        """
+        imagePath = os.path.join(tempfile.gettempdir(), 'ar_posePreview.png')
+        try:
+            cmds.playblast(completeFilename=imagePath, frame=[cmds.currentTime(query=True)], format='image',
+                           compression='png', widthHeight=(64, 64), percent=100, viewer=False,
+                           showOrnaments=False, forceOverwrite=True)
+            f = open(imagePath, 'rb')
+            try:
+                return f.read()
+            finally:
+                f.close()
+        except (RuntimeError, IOError):
+            return None
+    
+    def browseLibraryBtnCmd(self, *args):
+        """
+        Called when the Browse Library button is pressed
+        """
+        win = 'ar_poseLibraryWindow'
+        # kill the window if it exists
+        if cmds.window(win, exists=True):
+            cmds.deleteUI(win, window=True)
+        cmds.window(win, title='Pose Library', widthHeight=(300, 320))
+        form = cmds.formLayout()
+        # search by name or tag, the list only shows one page of the index
+        self.librarySearch = cmds.textField(placeholderText='Search name or tag',
+                                            changeCommand=self.refreshLibraryList)
+        self.libraryList = cmds.textScrollList(allowMultiSelection=False,
+                                               selectCommand=self.showLibraryPreview,
+                                               doubleClickCommand=self.applyLibraryPose)
+        self.libraryPreview = cmds.image(width=64, height=64)
+        nearestBtn = cmds.button(label='Nearest to Selection', height=26, command=self.nearestLibraryPoses)
+        applyBtn = cmds.button(label='Apply Pose', height=26, command=self.applyLibraryPose)
+        cmds.formLayout(form, edit=True, attachControl=
+                        ([self.libraryList, 'top', 5, self.librarySearch],
+                         [self.libraryList, 'bottom', 5, self.libraryPreview],
+                         [self.libraryPreview, 'bottom', 5, nearestBtn],
+                         [nearestBtn, 'bottom', 5, applyBtn]),
+                        attachForm=
+                        ([self.librarySearch, 'top', 5],
+                         [self.librarySearch, 'left', 5],
+                         [self.librarySearch, 'right', 5],
+                         [self.libraryList, 'left', 5],
+                         [self.libraryList, 'right', 5],
+                         [self.libraryPreview, 'left', 5],
+                         [nearestBtn, 'left', 5],
+                         [nearestBtn, 'right', 5],
+                         [applyBtn, 'left', 5],
+                         [applyBtn, 'right', 5],
+                         [applyBtn, 'bottom', 5]))
+        self.refreshLibraryList()
+        cmds.showWindow(win)
+    
+    def refreshLibraryList(self, *args):
+        """
+        List the poses matching the search field, read from the index only
+        """
+        library = self.getLibrary()
+        text = cmds.textField(self.librarySearch, query=True, text=True).strip()
+        rows = library.query(name=text, limit=200)
+        if text:
+            # also show poses tagged with the search text
+            ids = set([row['id'] for row in rows])
+            rows += [row for row in library.query(tags=[text], limit=200) if row['id'] not in ids]
+        self.setLibraryList(rows)
+    
+    def setLibraryList(self, rows, distances=None):
+        """
+        Fill the library window list with index rows
+        """
+        self.libraryIds = [row['id'] for row in rows]
+        cmds.textScrollList(self.libraryList, edit=True, removeAll=True)
+        for i, row in enumerate(rows):
+            label = '%s  [%s, %d attrs]' % (row['name'], row['rig'], row['numChannels'])
+            if distances is not None:
+                label = '%.3f  %s' % (distances[i], label)
+            cmds.textScrollList(self.libraryList, edit=True, append=label)
+    
+    def nearestLibraryPoses(self, *args):
+        """
+        List the library poses nearest to the pose of the selected transforms
+        """
+        rootNodes = self.getSelection()
+        if rootNodes is None:
+            return
+        rig = rigName(rootNodes)
+        # the same capture path as copying and saving poses
+        data = self.saveHierarchy(rootNodes)
+        matches = self.getLibrary().nearest(rig, data, k=20)
+        self.setLibraryList([row for distance, row in matches], [distance for distance, row in matches])
+    
+    def selectedLibraryPose(self):
+        """
+        Return the id of the pose selected in the library window, or None
+        """
+        indices = cmds.textScrollList(self.libraryList, query=True, selectIndexedItem=True)
+        if not indices:
+            return None
+        return self.libraryIds[indices[0] - 1]
+    
+    def showLibraryPreview(self, *args):
+        """
+        Show the stored preview of the selected pose
+        """
+        poseId = self.selectedLibraryPose()
+        if poseId is None:
+            return
+        preview = self.getLibrary().preview(poseId)
+        if preview is None:
+            cmds.image(self.libraryPreview, edit=True, visible=False)
+            return
+        imagePath = os.path.join(tempfile.gettempdir(), 'ar_posePreview_%d.png' % poseId)
+        f = open(imagePath, 'wb')
+        try:
+            f.write(preview)
+        finally:
+            f.close()
+        cmds.image(self.libraryPreview, edit=True, image=imagePath, visible=True)
+    
+    def applyLibraryPose(self, *args):
+        """
+        Apply the selected library pose, its file is only read now
+        """
+        poseId = self.selectedLibraryPose()
+        if poseId is None:
+            return
+        self.applyPose(self.getLibrary().channels(poseId))
+    
+    def exportPose(self, filePath, rootNodes):      
+        """
+        Save a pose file at filePath for rootNodes and their children
+        """
+        print filePath
+        print rootNodes 
+        # try to open the file, written under a temporary name until complete
+        try:
+            atomic = poseFile.AtomicFile(filePath, 'wb')
+        except (IOError, OSError):
+            cmds.confirmDialog(title='Error', button='OK', message='Unable to write file: %s' % filePath)
+            raise
+        f = atomic.f
+        try:
+            if self.binaryPoses:
+                # stream node records to the file as they are captured
+                writer = poseFile.PoseStreamWriter(f, self.sparsePoses)
+                for node, values in self.iterCapture(rootNodes):
+                    writer.write(node, values)
+                writer.close()
+                if writer.numSkipped:
+                    sys.stderr.write('%d non-numeric attributes were not saved.\n' % writer.numSkipped)
+            else:
+                # pickle the serialized data, legacy format
+                cPickle.dump(poseFile.legacyShape(self.saveHierarchy(rootNodes)), f)
+        except:
+            # leave no partial file behind
+            atomic.discard()
+            raise
+        # close the file and move it in place
+        atomic.commit()
+    
+    def exportPoses(self, characters, workers=None):
+        """
+        Save one pose file per character, characters being (filePath, rootNodes)
+        pairs. The poses are captured one after the other on the main thread,
+        then written by a pool of threads, each file under a temporary name
+        until complete. Return a list of (filePath, error) for the files that
+        could not be written.
+        """
+        start = time.time()
+        jobs = [(filePath, self.saveHierarchy(rootNodes)) for filePath, rootNodes in characters]
+        captureTime = time.time() - start
+        sys.stdout.write('Captured %d poses in %.3fs (%.1f poses/s)\n' %
+                         (len(jobs), captureTime, len(jobs) / max(captureTime, 1e-6)))
+        errors = poseFile.writePoses(jobs, self.binaryPoses, workers)
+        elapsed = time.time() - start
+        sys.stdout.write('Exported %d poses in %.3fs (%.1f poses/s)\n' %
+                         (len(jobs) - len(errors), elapsed, len(jobs) / max(elapsed, 1e-6)))
+        for filePath, error in errors:
+            sys.stderr.write('Unable to write file: %s (%s)\n' % (filePath, error))
+        return errors
+    
+    def saveHierarchy(self, rootNodes, data=None):
+        """
+        Append attribute values for all keyable attributes to data, a
+        poseFile.PoseData created if not given, and return it. data is marked
+        sparse when it holds a sparse capture.
+        """
+        if data is None:
+            data = poseFile.PoseData()
+        data.sparse = data.sparse or self.sparsePoses
+        for node, values in self.iterCapture(rootNodes):
+            # the same node under two roots is captured once
+            data.addNode(node, values)
+        return data
+    
+    def iterCapture(self, rootNodes):
+        """
+        Generate (node, [[attr, value], ...]) for rootNodes and all their
+        descendants with keyable attributes, one node at a time
+        """
+        start = time.time()
+        numNodes = 0
+        numAttrs = 0
+        # walk the whole hierarchy in one pass, no recursion
+        for dagPath in iterHierarchy(rootNodes):
+            # instanced nodes are reached once per path, capture them once
+            if dagPath.isInstanced() and dagPath.instanceNumber() > 0:
+                continue
+            numNodes += 1
+            # read all keyable plugs of the node in one go, each node list built once
+            values = readKeyablePlugs(dagPath.node(), self.sparsePoses, self.capturePrecision)
+            if values:
+                numAttrs += len(values)
+                yield (dagPath.partialPathName(), values)
+        elapsed = time.time() - start
+        self.captureStats = (numNodes, numAttrs, elapsed)
+        sys.stdout.write('Captured %d nodes, %d attributes in %.3fs (%.0f nodes/s)\n' %
+                         (numNodes, numAttrs, elapsed, numNodes / max(elapsed, 1e-6)))
+    
+    def exportClip(self, filePath, rootNodes, start, end):
+        """
+        Save a clip file at filePath for rootNodes and their children over the
+        frames start to end
+        """
+        try:
+            f = open(filePath, 'wb')
+        except IOError:
+            cmds.confirmDialog(title='Error', button='OK', message='Unable to write file: %s' % filePath)
+            raise
+        try:
+            poseClip.writeClip(f, self.captureClip(rootNodes, start, end))
+        finally:
+            f.close()
+    
+    def captureClip(self, rootNodes, start, end):
+        """
+        Return a poseClip.Clip of rootNodes and their descendants over the
+        frames start to end. Animated channels are read from their curves'
+        keys, without changing the current time; the others, including
+        channels driven by anything but a single curve, keep their current value.
+        """
+        clock = time.time()
+        clip = poseClip.Clip(start, end, self.clipTolerance)
+        for dagPath in iterHierarchy(rootNodes):
+            if dagPath.isInstanced() and dagPath.instanceNumber() > 0:
+                continue
+            node = dagPath.partialPathName()
+            for attr, plug in iterKeyablePlugs(dagPath.node()):
+                attrName = om.MFnAttribute(attr).name()
+                fnCurve = findAnimCurve(plug)
+                if fnCurve is not None:
+                    clip.channels.append(readCurveKeys(node, attrName, fnCurve, start, end))
+                    continue
+                value = plugValue(plug, attr)
+                try:
+                    clip.channels.append(poseClip.ClipChannel(node, attrName, value=float(value)))
+                except (TypeError, ValueError):
+                    pass
+        elapsed = time.time() - clock
+        numKeys = clip.numKeys()
+        sys.stdout.write('Captured %d channels, %d keys over frames %g-%g in %.3fs (%.0f keys/s)\n' %
+                         (len(clip.channels), numKeys, start, end, elapsed, numKeys / max(elapsed, 1e-6)))
+        return clip
+    
+    def importClip(self, filePath):
+        """
+        Import the clip stored in filePath. Curves are written with one addKeys
+        call each by the arApplyPose command and static channels go through
+        applyPose(), both in one chunk of Maya's undo queue.
+        """
+        try:
+            f = open(filePath, 'rb')
+        except IOError:
+            cmds.confirmDialog(title='Error', button='OK', message='Unable to open file: %s' % filePath)
+            raise
+        try:
+            clip = poseClip.readClip(f)
+        finally:
+            f.close()
+        statics = [(channel.node, channel.attr, channel.value) for channel in clip.channels if channel.isStatic()]
+        edit = ClipImport(clip)
+        cmds.undoInfo(openChunk=True)
+        try:
+            applyModifier(edit)
+            self.applyPose(statics)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+        sys.stdout.write('Wrote %d curves, %d keys.\n' % (len(edit.changes), clip.numKeys()))
+        if edit.errAttrs:
+            self.importErrorWindow(edit.errAttrs)
+            sys.stderr.write('Not all curves could be loaded.')
+    
+    def importPose(self, filePath):
+        """
+        Import the pose data stored in filePath
+        """
+        # try to open the file
+        try:
+            poseFile.isBinaryPose(filePath)
+        except IOError:
+            cmds.confirmDialog(title='Error', button='OK', message='Unable to open file: %s' % filePath)
+            raise
+        # a file loaded before and unchanged since comes from the cache, any
+        # other is streamed from disk and cached as it is applied
+        self.applyPose(poseCache.load(filePath))
+    
+    def applyPose(self, channels):
+        """
+        Set the attributes of a pose given as (node, attr, value) channels, as
+        a single undoable step. Plugs come from the rig's PlugResolver, and
+        missing, locked or driven attributes are reported without being set.
+        The attributes a sparse pose left out, as flagged by its
+        poseFile.PoseChannels, are reset to their default.
+        """
+        # collect every value of the pose into one modifier while reading it
+        modifier = om.MDGModifier()
+        if getattr(channels, 'sparse', False):
+            channels = iterWithDefaults(channels)
+        errAttrs = {}
+        written = 0
+        unchanged = 0
+        currentNode = None
+        current = {}
+        for node, attr, value in channels:
+            if self.deltaApply:
+                # channels come grouped by node, read each node's current values once
+                if node != currentNode:
+                    currentNode = node
+                    current = readCurrentValues(node)
+                # an unchanged value does not need to dirty the graph
+                if attr in current and not valuesDiffer(current[attr], value, self.deltaEpsilon):
+                    unchanged += 1
+                    continue
+            resolved = getPlugResolver(node).resolve(node, attr)
+            if resolved is None or not plugWritable(resolved[0]):
+                errAttrs.setdefault(node, []).append([attr, value])
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                errAttrs.setdefault(node, []).append([attr, value])
+                continue
+            addPlugValue(modifier, resolved[0], resolved[1], value)
+            written += 1
+        if written:
+            applyModifier(modifier)
+        self.applyStats = (written, unchanged)
+        sys.stdout.write('Set %d attributes, skipped %d unchanged ones.\n' % (written, unchanged))
+        # display error message if needed
+        if len(errAttrs) > 0:
+            self.importErrorWindow(errAttrs)
+            sys.stderr.write('Not all attributes could be loaded.')
+            #cmds.warning("Not all attributes could be loaded.")
+    
+    def importErrorWindow(self, errAttrs):
+        """
+        An error window to display if there are unknown attributes when importing a pose.
+        Failures are grouped by node and listed one page at a time; the full
+        list can be saved as CSV without being displayed.
+        """
+        win = 'ar_errorWindow'
+        # kill the window if it exists
+        if cmds.window(win, exists=True):
+            cmds.deleteUI(win, window=True)
+        # one flat list of the failures, built in a single pass
+        self.errAttrs = errAttrs
+        self.errorNodes = sorted(errAttrs, key=lambda node: -len(errAttrs[node]))
+        self.errorRows = [(node, item[0], item[-1]) for node in self.errorNodes for item in errAttrs[node]]
+        self.errorPage = 0
+        # create the window
+        cmds.window(win, title='Unknown Attributes', widthHeight=(400, 360), sizeable=True)
+        # create a formLayout for window
+        errorForm = cmds.formLayout()
+        # info label
+        infoLb = cmds.text(label='%d attributes on %d nodes can\'t be found.'
+                            '\nThey\'re being ignored.' % (len(self.errorRows), len(self.errorNodes)), align='left')
+        # failure counts per node, selecting nodes narrows the list below
+        self.errorNodeList = cmds.textScrollList(allowMultiSelection=True, height=100,
+                                                 append=['%s (%d)' % (node, len(errAttrs[node]))
+                                                         for node in self.errorNodes],
+                                                 selectCommand=self.filterErrorRows)
+        # the failures of the current page only
+        self.errorList = cmds.textScrollList(allowMultiSelection=False)
+        prevBtn = cmds.button(label='<', width=30, command=functools.partial(self.showErrorPage, -1))
+        self.errorPageLb = cmds.text(label='', align='center')
+        nextBtn = cmds.button(label='>', width=30, command=functools.partial(self.showErrorPage, 1))
+        csvBtn = cmds.button(label='Save as CSV', height=26, command=self.saveErrorCsv)
+        # create a button to dismiss the window
+        btn = cmds.button(label='OK', height=26, command=lambda *args: cmds.deleteUI(win, window=True))
+        # attach controls
+        cmds.formLayout(errorForm, edit=True, attachControl=
+                        ([self.errorNodeList, 'top', 5, infoLb],
+                         [self.errorList, 'top', 5, self.errorNodeList],
+                         [self.errorList, 'bottom', 5, prevBtn],
+                         [prevBtn, 'bottom', 5, csvBtn],
+                         [self.errorPageLb, 'bottom', 5, csvBtn],
+                         [self.errorPageLb, 'left', 5, prevBtn],
+                         [self.errorPageLb, 'right', 5, nextBtn],
+                         [nextBtn, 'bottom', 5, csvBtn],
+                         [csvBtn, 'bottom', 5, btn]),
+                        attachForm=
+                        ([infoLb, 'top', 5],
+                         [infoLb, 'left', 5],
+                         [infoLb, 'right', 5],
+                         [self.errorNodeList, 'left', 5],
+                         [self.errorNodeList, 'right', 5],
+                         [self.errorList, 'left', 5],
+                         [self.errorList, 'right', 5],
+                         [prevBtn, 'left', 5],
+                         [nextBtn, 'right', 5],
+                         [csvBtn, 'left', 5],
+                         [csvBtn, 'right', 5],
+                         [btn, 'left', 5],
+                         [btn, 'right', 5],
+                         [btn, 'bottom', 5]))
+        self.showErrorPage(0)
+        # show the window
+        cmds.showWindow(win)
+    
+    def filterErrorRows(self, *args):
+        """
+        List only the failures of the nodes selected in the error window, or all
+        of them when none is
+        """
+        indices = cmds.textScrollList(self.errorNodeList, query=True, selectIndexedItem=True) or []
+        nodes = [self.errorNodes[i - 1] for i in indices] or self.errorNodes
+        self.errorRows = [(node, item[0], item[-1]) for node in nodes for item in self.errAttrs[node]]
+        self.errorPage = 0
+        self.showErrorPage(0)
+    
+    def showErrorPage(self, step, *args):
+        """
+        Move step pages through the failures and display that page
+        """
+        numPages = max(1, (len(self.errorRows) + kErrorPageSize - 1) // kErrorPageSize)
+        self.errorPage = min(max(self.errorPage + step, 0), numPages - 1)
+        first = self.errorPage * kErrorPageSize
+        lines = [formatErrorRow(node, attr, value) for node, attr, value in self.errorRows[first:first + kErrorPageSize]]
+        cmds.textScrollList(self.errorList, edit=True, removeAll=True)
+        if lines:
+            cmds.textScrollList(self.errorList, edit=True, append=lines)
+        cmds.text(self.errorPageLb, edit=True, label='Page %d of %d' % (self.errorPage + 1, numPages))
+    
+    def saveErrorCsv(self, *args):
+        """
+        Save every failure of the last import as CSV, whatever is displayed
+        """
+        filePath = cmds.fileDialog2(fileFilter='CSV (*.csv)', fileMode=0)
+        if not filePath:
+            return
+        writeErrorCsv(filePath[0], self.errAttrs)
@@ -0,0 +1,96 @@
+"""
+Nearest neighbour search over pose feature vectors, used by the pose library
+(P_maya_c7_poseLibrary.py) to find the stored poses closest to a captured one.
+
+scipy's cKDTree answers queries over tens of thousands of poses in well under
+a millisecond and is used when available. Without it a plain python kd-tree
+gives the same answers, more slowly.
+
+Nothing in this module imports Maya.
+"""
+import heapq, random
+
+try:
+    import numpy
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# indices per leaf of the python kd-tree
+kLeafSize = 16
+# points sampled to pick the split axis of a node
+kAxisSample = 64
+
+class KDTree(object):
+    """
+    k nearest neighbours among a fixed set of equal length vectors, by
+    euclidean distance
+    """
+    def __init__(self, vectors, leafSize=kLeafSize):
+        self.vectors = [list(vector) for vector in vectors]
+        self.leafSize = leafSize
+        self.tree = None
+        self.root = None
+        if not self.vectors:
+            return
+        if cKDTree is not None:
+            self.tree = cKDTree(numpy.asarray(self.vectors, dtype=numpy.float64), leafsize=leafSize)
+        else:
+            self.root = self._build(list(range(len(self.vectors))))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def query(self, vector, k=1):
+        """
+        Return up to k (distance, index) pairs, nearest first. index is the
+        position of the vector in the list the tree was built from.
+        """
+        k = min(k, len(self.vectors))
+        if k < 1:
+            return []
+        if self.tree is not None:
+            distances, indices = self.tree.query(numpy.asarray(vector, dtype=numpy.float64), k=k)
+            if k == 1:
+                return [(float(distances), int(indices))]
+            return [(float(d), int(i)) for d, i in zip(distances, indices)]
+        # max-heap of the best k so far, as (-squared distance, index)
+        best = []
+        self._search(self.root, list(vector), k, best)
+        return [(d ** 0.5, i) for d, i in sorted([(-negDist, i) for negDist, i in best])]
+
+    def _build(self, indices):
+        """
+        Return a leaf, a list of indices, or a node (axis, split, left, right)
+        """
+        if len(indices) <= self.leafSize:
+            return indices
+        vectors = self.vectors
+        # split on the axis with the widest spread in a sample of the points
+        sample = indices if len(indices) <= kAxisSample else random.sample(indices, kAxisSample)
+        spreads = [max([vectors[i][axis] for i in sample]) - min([vectors[i][axis] for i in sample])
+                   for axis in range(len(vectors[indices[0]]))]
+        axis = spreads.index(max(spreads))
+        if spreads[axis] == 0.0:
+            return indices
+        indices.sort(key=lambda i: vectors[i][axis])
+        middle = len(indices) // 2
+        split = vectors[indices[middle]][axis]
+        return (axis, split, self._build(indices[:middle]), self._build(indices[middle:]))
+
+    def _search(self, node, vector, k, best):
+        if isinstance(node, list):
+            for i in node:
+                dist = sum([(a - b) * (a - b) for a, b in zip(vector, self.vectors[i])])
+                if len(best) < k:
+                    heapq.heappush(best, (-dist, i))
+                elif dist < -best[0][0]:
+                    heapq.heapreplace(best, (-dist, i))
+            return
+        axis, split, left, right = node
+        delta = vector[axis] - split
+        near, far = (left, right) if delta < 0 else (right, left)
+        self._search(near, vector, k, best)
+        # the far side can only hold closer points if the split plane is closer
+        if len(best) < k or delta * delta < -best[0][0]:
+            self._search(far, vector, k, best)
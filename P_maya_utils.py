@@ -0,0 +1,49 @@
+"""
+Helpers shared by the pose, helix and texture processing modules.
+
+Nothing in this module imports Maya.
+"""
+import os
+import sys
+import errno
+import binascii
+import tempfile
+
+def deepSize(obj, seen=None):
+    """
+    Return the size in bytes of obj and everything it holds, skipping the
+    objects whose ids are in seen. Each object is counted once.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deepSize(key, seen) + deepSize(value, seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            size += deepSize(item, seen)
+    elif hasattr(obj, '__dict__'):
+        size += deepSize(obj.__dict__, seen)
+    return size
+
+def makeTempFile(folder, prefix='tmp', suffix=''):
+    """
+    Create a new file in folder and return (fd, path) like tempfile.mkstemp,
+    but with the permissions open() gives a new file: mode 0o666 less the
+    umask, applied by the system, where mkstemp makes it readable by its
+    owner only. The umask itself is never read or changed.
+    """
+    flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_NOINHERIT', 0)
+    for attempt in range(tempfile.TMP_MAX):
+        name = '%s%s%s' % (prefix, binascii.hexlify(os.urandom(6)).decode('ascii'), suffix)
+        path = os.path.join(folder, name)
+        try:
+            return (os.open(path, flags, 0o666), os.path.abspath(path))
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+    raise IOError(errno.EEXIST, 'No usable temporary file name found in %s' % folder)